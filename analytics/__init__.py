@@ -1,4 +1,20 @@
 """Analytics and KPI computation module."""
-from .kpis import compute_kpis
+from .buckets import BUCKET_FREQUENCIES, BUCKET_STATS, aggregate_buckets, bucket_frequency, bucket_sums
+from .kpis import (
+    compute_kpis,
+    compute_metric_summary,
+    format_kpis,
+    format_metric_summary,
+)
 
-__all__ = ["compute_kpis"]
+__all__ = [
+    "BUCKET_FREQUENCIES",
+    "BUCKET_STATS",
+    "aggregate_buckets",
+    "bucket_frequency",
+    "bucket_sums",
+    "compute_kpis",
+    "compute_metric_summary",
+    "format_kpis",
+    "format_metric_summary",
+]
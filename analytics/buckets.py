@@ -0,0 +1,167 @@
+"""Calendar bucket aggregation without sorting or resampling."""
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from data.dtypes import to_datetime64, to_float_array
+
+_NS_PER_DAY = 86_400 * 10**9
+# 1970-01-01, day 0, was a Thursday (Monday = 0)
+_EPOCH_WEEKDAY = 3
+_WEEKDAYS = ("MON", "TUE", "WED", "THU", "FRI", "SAT", "SUN")
+
+BUCKET_FREQUENCIES = ("D", *(f"W-{day}" for day in _WEEKDAYS), "MS", "QS", "YS")
+BUCKET_STATS = ("sum", "count", "min", "max")
+
+
+def bucket_frequency(span_days: int) -> str:
+    """Resample frequency for a date span: monthly from 60 days, weekly below."""
+    return "MS" if span_days >= 60 else "W-MON"
+
+
+def _bucket_numbers(stamps: np.ndarray, freq: str) -> np.ndarray:
+    """Absolute calendar bucket number of each datetime64[ns] value, increasing with time.
+
+    Buckets are labelled like ``resample``: "D", "MS", "QS" and "YS" by
+    their start; "W-<DAY>" weeks are closed on the right and labelled by
+    the <DAY> on or after the date.
+    """
+    if freq == "D":
+        return stamps.view("i8") // _NS_PER_DAY
+    if freq.startswith("W-"):
+        days = stamps.view("i8") // _NS_PER_DAY
+        anchor = _WEEKDAYS.index(freq[2:])
+        # Ceiling division: week n ends on day 7n - EPOCH_WEEKDAY + anchor
+        return -((anchor - _EPOCH_WEEKDAY - days) // 7)
+    months = stamps.astype("datetime64[M]").view("i8")
+    if freq == "MS":
+        return months
+    if freq == "QS":
+        return months // 3
+    return months // 12
+
+
+def _bucket_labels(first: int, last: int, freq: str) -> pd.DatetimeIndex:
+    """Labels of every bucket from number ``first`` to ``last``, as ``resample`` gives them."""
+    if freq == "D":
+        start = np.datetime64(first, "D")
+    elif freq.startswith("W-"):
+        anchor = _WEEKDAYS.index(freq[2:])
+        start = np.datetime64(7 * first - _EPOCH_WEEKDAY + anchor, "D")
+    else:
+        months = {"MS": 1, "QS": 3, "YS": 12}[freq]
+        start = np.datetime64(first * months, "M")
+    pandas_freq = {"QS": "QS-JAN", "YS": "YS-JAN"}.get(freq, freq)
+    return pd.date_range(pd.Timestamp(start), periods=last - first + 1, freq=pandas_freq)
+
+
+def aggregate_buckets(
+    dates: pd.Series,
+    values: Optional[pd.Series],
+    freq: str,
+    stats: Sequence[str] = BUCKET_STATS,
+) -> pd.DataFrame:
+    """Aggregate values into calendar buckets in one pass, without sorting.
+
+    Each date is mapped arithmetically to a bucket number and the values are
+    accumulated with ``np.bincount`` (sum, count) and ``ufunc.at`` (min,
+    max), so the cost is O(n) plus the number of buckets. Rows with a
+    missing date or value are ignored, and the result spans every bucket
+    from the first to the last one holding data, like
+    ``series.resample(freq)``: empty buckets have a sum and count of 0 and
+    a NaN min and max.
+
+    Sums are accumulated in float64 in row order, so they can differ from
+    pandas' compensated sums in the last bits; counts, min, max and the
+    bucket labels are exact.
+
+    Timezone-aware dates fall back to ``resample``, whose buckets follow
+    local wall-clock time across DST changes.
+
+    Args:
+        dates: Datetime series (NumPy or Arrow-backed)
+        values: Numeric series aligned with ``dates``, or None to count dates
+        freq: One of ``BUCKET_FREQUENCIES``
+        stats: Statistics to compute, from ``BUCKET_STATS``
+
+    Returns:
+        Float DataFrame (count as int64) with one column per statistic,
+        indexed by bucket label
+    """
+    if freq not in BUCKET_FREQUENCIES:
+        raise ValueError(f"Unsupported bucket frequency {freq!r}; expected one of {BUCKET_FREQUENCIES}")
+    unknown = [s for s in stats if s not in BUCKET_STATS]
+    if unknown:
+        raise ValueError(f"Unsupported statistics {unknown}; expected some of {BUCKET_STATS}")
+
+    dates = to_datetime64(dates)
+    x = np.ones(len(dates)) if values is None else to_float_array(values)
+    if getattr(dates.dt, "tz", None) is not None:
+        return _aggregate_with_resample(dates, x, freq, stats)
+
+    stamps = dates.to_numpy(dtype="datetime64[ns]")
+    keep = ~(np.isnat(stamps) | np.isnan(x))
+    if not keep.all():
+        stamps, x = stamps[keep], x[keep]
+    if len(stamps) == 0:
+        empty = {s: pd.Series(dtype="int64" if s == "count" else "float64") for s in stats}
+        return pd.DataFrame(empty, index=pd.DatetimeIndex([], name=dates.name))
+
+    numbers = _bucket_numbers(stamps, freq)
+    first, last = int(numbers.min()), int(numbers.max())
+    ids = numbers - first
+    size = last - first + 1
+
+    columns = {}
+    count = np.bincount(ids, minlength=size)
+    for stat in stats:
+        if stat == "sum":
+            columns[stat] = np.bincount(ids, weights=x, minlength=size)
+        elif stat == "count":
+            columns[stat] = count
+        else:
+            ufunc, start = (np.minimum, np.inf) if stat == "min" else (np.maximum, -np.inf)
+            acc = np.full(size, start)
+            ufunc.at(acc, ids, x)
+            acc[count == 0] = np.nan
+            columns[stat] = acc
+    index = _bucket_labels(first, last, freq).rename(dates.name)
+    return pd.DataFrame(columns, index=index)
+
+
+def _aggregate_with_resample(dates: pd.Series, x: np.ndarray, freq: str, stats: Sequence[str]) -> pd.DataFrame:
+    series = pd.Series(x, index=pd.DatetimeIndex(dates, name=dates.name)).dropna()
+    series = series[series.index.notna()].sort_index()
+    resampler = series.resample({"QS": "QS-JAN", "YS": "YS-JAN"}.get(freq, freq))
+    return pd.DataFrame({stat: getattr(resampler, stat)() for stat in stats})
+
+
+def bucket_sums(
+    dates: pd.Series,
+    values: pd.Series,
+    freq: Optional[str] = None,
+) -> Tuple[pd.Series, Optional[str]]:
+    """Sum a metric per calendar bucket, choosing weekly or monthly buckets by span.
+
+    Equivalent to dropping rows with a missing date or value and calling
+    ``resample(freq).sum()``, with ``freq`` from ``bucket_frequency`` unless
+    given.
+
+    Args:
+        dates: Datetime series
+        values: Numeric series aligned with ``dates``
+        freq: Bucket frequency, or None to pick it from the date span
+
+    Returns:
+        (float sums named after ``values`` and indexed by bucket label,
+        frequency used) tuple; the frequency is None if there is no data
+    """
+    if freq is None:
+        stamps = to_datetime64(dates)
+        present = stamps[stamps.notna().to_numpy() & ~np.isnan(to_float_array(values))]
+        if present.empty:
+            return pd.Series(dtype="float64", index=pd.DatetimeIndex([], name=dates.name), name=values.name), None
+        freq = bucket_frequency((present.max() - present.min()).days)
+    sums = aggregate_buckets(dates, values, freq, stats=("sum",))["sum"]
+    return sums.rename(values.name), freq
@@ -4,6 +4,67 @@ from typing import List, Optional, Tuple
 import numpy as np
 import pandas as pd
 
+from data.dtypes import to_datetime64, to_float_array
+
+from .buckets import _bucket_numbers, bucket_frequency, bucket_sums
+
+
+def _is_finite(value) -> bool:
+    """Return True for finite numbers; False for NaN, inf and ``pd.NA``."""
+    return pd.notna(value) and bool(np.isfinite(value))
+
+
+def format_kpis(
+    n_rows: int,
+    n_cols: int,
+    date_range: Optional[Tuple[pd.Timestamp, pd.Timestamp]] = None,
+    metric_col: Optional[str] = None,
+    total=None,
+    avg=None,
+    period_sums: Optional[pd.Series] = None,
+) -> List[Tuple[str, str]]:
+    """Format already aggregated values as KPI (label, value) tuples.
+
+    Shared by ``compute_kpis`` and by sources that aggregate elsewhere (e.g.
+    inside a database), so both produce identical KPIs.
+
+    Args:
+        n_rows: Number of rows
+        n_cols: Number of columns
+        date_range: (min, max) of the date column, if any
+        metric_col: Name of the metric column (can be None)
+        total: Sum of the metric
+        avg: Mean of the metric
+        period_sums: Metric sums per time bucket, used for the period change
+
+    Returns:
+        List of (label, value) tuples representing KPIs
+    """
+    kpis: List[Tuple[str, str]] = []
+
+    kpis.append(("Rows", f"{n_rows:,}"))
+    kpis.append(("Columns", f"{n_cols:,}"))
+
+    if date_range is not None:
+        dmin, dmax = date_range
+        if pd.notna(dmin) and pd.notna(dmax):
+            kpis.append(("Date range", f"{dmin.date()} → {dmax.date()}"))
+
+    if metric_col:
+        kpis.append((f"Total {metric_col}", f"{total:,.2f}" if _is_finite(total) else "—"))
+        kpis.append((f"Average {metric_col}", f"{avg:,.2f}" if _is_finite(avg) else "—"))
+
+        if period_sums is not None and len(period_sums) >= 2:
+            last = period_sums.iloc[-1]
+            prev = period_sums.iloc[-2]
+            if prev != 0:
+                pct = (last - prev) / abs(prev) * 100.0
+                kpis.append(("Change vs prev period", f"{pct:+.1f}%"))
+            else:
+                kpis.append(("Change vs prev period", "—"))
+
+    return kpis
+
 
 def compute_kpis(
     df: pd.DataFrame,
@@ -26,37 +87,140 @@ def compute_kpis(
     Returns:
         List of (label, value) tuples representing KPIs
     """
-    kpis: List[Tuple[str, str]] = []
-
-    kpis.append(("Rows", f"{len(df):,}"))
-    kpis.append(("Columns", f"{df.shape[1]:,}"))
-
+    date_range = None
     if date_col:
-        dmin = df[date_col].min()
-        dmax = df[date_col].max()
-        if pd.notna(dmin) and pd.notna(dmax):
-            kpis.append(("Date range", f"{dmin.date()} → {dmax.date()}"))
+        date_range = (df[date_col].min(), df[date_col].max())
 
+    total = avg = period_sums = None
     if metric_col:
         total = df[metric_col].sum(skipna=True)
         avg = df[metric_col].mean(skipna=True)
-        kpis.append((f"Total {metric_col}", f"{total:,.2f}" if np.isfinite(total) else "—"))
-        kpis.append((f"Average {metric_col}", f"{avg:,.2f}" if np.isfinite(avg) else "—"))
 
         if date_col:
-            tmp = df[[date_col, metric_col]].dropna()
-            if len(tmp) >= 10:
-                tmp = tmp.sort_values(date_col)
-                span_days = (tmp[date_col].max() - tmp[date_col].min()).days
-                freq = "MS" if span_days >= 60 else "W-MON"
-                series = tmp.set_index(date_col)[metric_col].resample(freq).sum()
-                if len(series) >= 2:
-                    last = series.iloc[-1]
-                    prev = series.iloc[-2]
-                    if prev != 0:
-                        pct = (last - prev) / abs(prev) * 100.0
-                        kpis.append(("Change vs prev period", f"{pct:+.1f}%"))
-                    else:
-                        kpis.append(("Change vs prev period", "—"))
+            valid = df[date_col].notna() & df[metric_col].notna()
+            if valid.sum() >= 10:
+                period_sums, _ = bucket_sums(df[date_col], df[metric_col])
 
-    return kpis
+    return format_kpis(len(df), df.shape[1], date_range, metric_col, total, avg, period_sums)
+
+
+METRIC_SUMMARY_COLUMNS = ["Metric", "Total", "Average", "Min", "Max", "Period change"]
+
+
+def _numeric_metric_columns(df: pd.DataFrame, date_col: Optional[str]) -> List[str]:
+    return [
+        c for c in df.columns
+        if c != date_col
+        and pd.api.types.is_numeric_dtype(df[c])
+        and not pd.api.types.is_bool_dtype(df[c])
+    ]
+
+
+def _period_changes(df: pd.DataFrame, date_col: str, metric_cols: List[str]) -> pd.Series:
+    """Period-over-period change for several metrics, bucketing the dates once per frequency.
+
+    Matches ``compute_kpis`` column by column: each metric uses only rows where
+    both the date and the metric are present, needs at least 10 such rows,
+    picks monthly or weekly buckets from its own date span, and compares its
+    own last bucket with the one before it.
+    """
+    dates = to_datetime64(df[date_col])
+    if getattr(dates.dt, "tz", None) is not None:
+        # Calendar buckets follow local wall-clock time, as with resample
+        dates = dates.dt.tz_localize(None)
+    valid = dates.notna().to_numpy()
+    stamps = dates.to_numpy(dtype="datetime64[ns]")[valid]
+    values = np.column_stack([to_float_array(df[c])[valid] for c in metric_cols])
+    changes = pd.Series(np.nan, index=metric_cols, dtype="float64")
+    if len(stamps) == 0:
+        return changes
+
+    mask = ~np.isnan(values)
+    counts = mask.sum(axis=0)
+    ns = stamps.view("i8")[:, None]
+    first = np.where(mask, ns, np.iinfo(np.int64).max).min(axis=0)
+    last = np.where(mask, ns, np.iinfo(np.int64).min).max(axis=0)
+    span_days = (last - first) // (24 * 3600 * 10**9)
+
+    eligible = counts >= 10
+    freqs = [bucket_frequency(days) for days in span_days]
+    for freq in ("MS", "W-MON"):
+        cols = [j for j, (ok, f) in enumerate(zip(eligible, freqs)) if ok and f == freq]
+        if not cols:
+            continue
+        numbers = _bucket_numbers(stamps, freq)
+        for j in cols:
+            present = mask[:, j]
+            own = numbers[present]
+            lo, hi = own.min(), own.max()
+            # The metric's own series spans its first to its last bucket
+            if hi - lo < 1:
+                continue
+            # Bins: 0 for older buckets, 1 for the previous one, 2 for the last
+            bins = np.maximum(own - hi, -2) + 2
+            _, prev, cur = np.bincount(bins, weights=values[present, j], minlength=3)
+            if prev != 0:
+                changes[metric_cols[j]] = (cur - prev) / abs(prev) * 100.0
+    return changes
+
+
+def compute_metric_summary(
+    df: pd.DataFrame,
+    date_col: Optional[str],
+    metric_cols: Optional[List[str]] = None,
+) -> pd.DataFrame:
+    """Compute KPIs for many numeric columns at once.
+
+    Totals, averages, min and max come from a single multi-column aggregation,
+    and period-over-period change from calendar bucket ids computed once per
+    bucket frequency, instead of one ``compute_kpis`` pass per metric.
+
+    Args:
+        df: Input DataFrame
+        date_col: Name of the date column (can be None)
+        metric_cols: Metric columns to summarize (defaults to all numeric,
+            non-boolean columns)
+
+    Returns:
+        DataFrame with one row per metric and ``METRIC_SUMMARY_COLUMNS`` columns;
+        change is NaN where it cannot be computed
+    """
+    if metric_cols is None:
+        metric_cols = _numeric_metric_columns(df, date_col)
+    if not metric_cols:
+        return pd.DataFrame(columns=METRIC_SUMMARY_COLUMNS)
+
+    stats = df[metric_cols].agg(["sum", "mean", "min", "max"])
+    if date_col:
+        changes = _period_changes(df, date_col, metric_cols)
+    else:
+        changes = pd.Series(np.nan, index=metric_cols, dtype="float64")
+
+    return pd.DataFrame({
+        "Metric": metric_cols,
+        "Total": to_float_array(stats.loc["sum"]),
+        "Average": to_float_array(stats.loc["mean"]),
+        "Min": to_float_array(stats.loc["min"]),
+        "Max": to_float_array(stats.loc["max"]),
+        "Period change": changes.to_numpy(),
+    })
+
+
+def format_metric_summary(summary: pd.DataFrame) -> List[List[str]]:
+    """Format a metric summary as display rows, header first.
+
+    Args:
+        summary: Output of ``compute_metric_summary``
+
+    Returns:
+        List of rows of strings, formatted like ``compute_kpis`` values
+    """
+    rows = [list(METRIC_SUMMARY_COLUMNS)]
+    for rec in summary.itertuples(index=False):
+        metric, total, avg, vmin, vmax, change = rec
+        rows.append([
+            str(metric),
+            *(f"{v:,.2f}" if _is_finite(v) else "—" for v in (total, avg, vmin, vmax)),
+            f"{change:+.1f}%" if _is_finite(change) else "—",
+        ])
+    return rows
@@ -1,17 +1,56 @@
 """DataCanvas - CSV analysis and visualization web application."""
+import functools
+import io
+import os
+import sqlite3
+import tempfile
+import time
+import uuid
+import weakref
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import pandas as pd
 import streamlit as st
 
 from config import CFG
 from data import (
+    DatasetCache,
+    DatasetStore,
+    LookupIndex,
+    SchemaCache,
+    SQLiteSource,
+    resolve_database_path,
+    content_hash,
+    sql_column_names,
     read_csv,
     clean_dataframe,
-    infer_date_column,
-    infer_metric_column,
-    infer_category_column,
+    infer_column_roles,
+    lookup_key_candidates,
 )
-from analytics import compute_kpis
-from visualization import build_trend_chart, build_category_chart
-from export import render_report_stub
+from analytics import bucket_frequency, format_kpis
+from visualization import (
+    plot_trend_chart,
+    plot_category_chart,
+    render_figure,
+)
+from pipeline import (
+    Graph,
+    JobQueueFull,
+    JobRunner,
+    build_dashboard_graph,
+    derived_nbytes,
+    load_dataset,
+    release_dataset,
+    set_dataset,
+)
+from pipeline.dashboard import ROLES
+from export import DATASET_FORMATS, render_report_stub, write_dataset
+
+# Datasets are shared between sessions as shallow copies; copy-on-write keeps
+# one session's modifications from leaking into another's (default in pandas 3)
+if int(pd.__version__.split(".")[0]) < 3:
+    pd.set_option("mode.copy_on_write", True)
 
 
 def apply_custom_css() -> None:
@@ -405,6 +444,769 @@ def apply_custom_css() -> None:
     """, unsafe_allow_html=True)
 
 
+def show_chart(image_bytes: bytes) -> None:
+    """Display pre-rendered chart bytes, decoding SVG for ``st.image``."""
+    if CFG.chart_format == "svg":
+        st.image(image_bytes.decode("utf-8"))
+    else:
+        st.image(image_bytes)
+
+
+@st.cache_resource
+def get_dataset_cache() -> Optional[DatasetCache]:
+    """Return the process-wide on-disk dataset cache, or None if disabled."""
+    if not CFG.cache_dir:
+        return None
+    return DatasetCache(CFG.cache_dir, CFG.cache_max_mb * 1024 * 1024)
+
+
+@st.cache_resource
+def get_schema_cache() -> Optional[SchemaCache]:
+    """Return the process-wide cache of remembered column layouts, or None if disabled."""
+    if not CFG.cache_dir:
+        return None
+    return SchemaCache(os.path.join(CFG.cache_dir, "schemas"), CFG.schema_cache_max_entries)
+
+
+@st.cache_resource
+def get_dataset_store() -> DatasetStore:
+    """Return the process-wide store that shares datasets across sessions."""
+    return DatasetStore(CFG.store_max_mb * 1024 * 1024, CFG.store_session_max_mb * 1024 * 1024)
+
+
+@st.cache_resource
+def get_job_runner() -> JobRunner:
+    """Return the process-wide bounded pool running pipeline jobs."""
+    return JobRunner(CFG.job_workers, CFG.job_max_pending)
+
+
+@st.cache_resource
+def get_section_executor() -> ThreadPoolExecutor:
+    """Return the process-wide thread pool computing dashboard sections."""
+    return ThreadPoolExecutor(max_workers=CFG.section_workers, thread_name_prefix="section")
+
+
+class _SessionToken:
+    """Kept in session state; collected when Streamlit discards the session."""
+
+
+def get_session_id() -> str:
+    """Return a stable identifier for the current browser session.
+
+    The session's datasets are released from the shared store once
+    Streamlit drops its session state, i.e. when the session ends.
+    """
+    if "session_id" not in st.session_state:
+        session_id = uuid.uuid4().hex
+        token = _SessionToken()
+        weakref.finalize(token, get_dataset_store().release_session, session_id)
+        st.session_state["session_token"] = token
+        st.session_state["session_id"] = session_id
+    return st.session_state["session_id"]
+
+
+def cancel_pipeline_job() -> None:
+    """Cancel this session's background pipeline job, if any."""
+    job = st.session_state.pop("pipeline_job", None)
+    if job is not None:
+        job.cancel()
+
+
+def get_dataset(uploaded) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """Return the cleaned dataset for an upload, loading it in the background.
+
+    Datasets already in the shared store are returned immediately. Otherwise
+    a pipeline job is submitted (cancelling any job for a previous upload)
+    and its progress is shown; the script reruns until the job finishes.
+
+    Args:
+        uploaded: Uploaded file object
+
+    Returns:
+        (cleaned DataFrame, metadata) tuple; metadata includes the
+        "file_key" identifying the upload's content and load options
+    """
+    use_arrow = bool(st.session_state.get("use_arrow_dtypes", CFG.use_arrow_dtypes))
+    projected = bool(st.session_state.get("projected_loading", CFG.projected_loading))
+    file_key = content_hash(
+        uploaded.getvalue(), "arrow" if use_arrow else "numpy", "projected" if projected else "full"
+    )
+    store = get_dataset_store()
+    session_id = get_session_id()
+
+    job = st.session_state.get("pipeline_job")
+    if job is not None and job.key != file_key:
+        cancel_pipeline_job()
+        job = None
+
+    if job is None:
+        shared = store.peek(file_key, session_id)
+        if shared is not None:
+            df, meta = shared
+            return df, {**meta, "file_key": file_key}
+
+        data = uploaded.getvalue()
+        cache = get_dataset_cache()
+        schemas = get_schema_cache()
+        try:
+            job = get_job_runner().submit(
+                file_key,
+                lambda j: store.get(
+                    file_key,
+                    session_id,
+                    lambda: load_dataset(
+                        data, file_key, cache, j, use_arrow, schemas, projected,
+                        CFG.projected_sample_rows, CFG.max_preview_rows,
+                    ),
+                ),
+            )
+        except JobQueueFull:
+            st.warning("⏳ The server is busy processing other uploads. Retrying shortly...")
+            time.sleep(CFG.job_poll_seconds * 4)
+            st.rerun()
+        st.session_state["pipeline_job"] = job
+
+    if not job.done():
+        stage, done, total = job.progress
+        text = f"⚙️ {stage}: {done:,} / {total:,}" if total else f"⚙️ {stage}..."
+        st.progress(min(done / total, 1.0) if total else 0.0, text=text)
+        time.sleep(CFG.job_poll_seconds)
+        st.rerun()
+
+    # Drop the finished job so later reruns go through the shared store
+    del st.session_state["pipeline_job"]
+    df, meta = job.result()
+    if meta.get("source") == "disk cache":
+        st.toast("Loaded from cache")
+    return df, {**meta, "file_key": file_key}
+
+
+def get_dashboard_graph() -> Graph:
+    """Return this session's memoized dashboard graph.
+
+    The graph lets go of a dataset, and of everything computed from it, when
+    the shared store drops the session's reference to it.
+    """
+    if "dashboard_graph" not in st.session_state:
+        graph = build_dashboard_graph()
+        get_dataset_store().on_release(get_session_id(), functools.partial(release_dataset, graph))
+        st.session_state["dashboard_graph"] = graph
+    return st.session_state["dashboard_graph"]
+
+
+def override_input(role: str) -> str:
+    """Graph input holding the user's override for a column role."""
+    return role.replace("_col", "_override")
+
+
+def override_key(role: str, file_key: str) -> str:
+    """Widget key of a column override; per upload so a new file starts on auto."""
+    return f"{override_input(role)}_{file_key[:12]}"
+
+
+def iter_sections(graph: Graph, names: Sequence[str], concurrent: bool) -> Iterator[Tuple[str, Any]]:
+    """Yield (name, value) for dashboard sections, each as soon as it is ready.
+
+    In concurrent mode all sections are computed at once on the section
+    pool and yielded in completion order, so the dashboard is complete after
+    the slowest section rather than the sum of all of them. Threads suffice:
+    the heavy parts (pandas aggregation, Agg rasterization, zlib) release the
+    GIL, and a process pool would have to pickle the DataFrame per section.
+    On a single CPU there is nothing to overlap, so sections run in order.
+    """
+    if not concurrent or (os.cpu_count() or 1) < 2:
+        for name in names:
+            yield name, graph.get(name)
+        return
+    futures = {future: name for name, future in graph.submit(names, get_section_executor()).items()}
+    for future in as_completed(futures):
+        yield futures[future], future.result()
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def load_lookup_table(digest: str, _data: bytes) -> pd.DataFrame:
+    """Read and clean an uploaded lookup table (cached by content digest)."""
+    return clean_dataframe(read_csv(io.BytesIO(_data)))
+
+
+@st.cache_resource(show_spinner=False, max_entries=8)
+def get_lookup_index(digest: str, key: str, _table: pd.DataFrame) -> LookupIndex:
+    """Return the hash index of a lookup table on ``key``, built once per table and key."""
+    return LookupIndex(_table, key)
+
+
+def current_lookup(fact_columns: List[str], file_key: str, default_on: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Resolve the uploaded lookup table and its join settings.
+
+    Read from session state before the controls are drawn, falling back to
+    defaults (the first unique column as key, joined on the fact column of
+    the same name or the category column) so a fresh upload joins at once.
+
+    Args:
+        fact_columns: Columns of the loaded dataset
+        file_key: Key of the current upload
+        default_on: Fact column to join on when none matches the key by name
+
+    Returns:
+        Dict with "digest", "table", "keys", "key", "on" and "index", or
+        None without a lookup table
+    """
+    uploaded = st.session_state.get("lookup_file")
+    if uploaded is None or not fact_columns:
+        return None
+    data = uploaded.getvalue()
+    digest = content_hash(data)
+    table = load_lookup_table(digest, data)
+    keys = lookup_key_candidates(table)
+    if not keys:
+        return None
+
+    key = st.session_state.get(f"lookup_key_{digest[:12]}")
+    if key not in keys:
+        key = keys[0]
+    on = st.session_state.get(f"lookup_on_{file_key[:12]}")
+    if on not in fact_columns:
+        on = key if key in fact_columns else default_on if default_on in fact_columns else fact_columns[0]
+    return {
+        "digest": digest,
+        "table": table,
+        "keys": keys,
+        "key": key,
+        "on": on,
+        "index": get_lookup_index(digest, key, table),
+    }
+
+
+def render_lookup_controls(
+    lookup: Optional[Dict[str, Any]],
+    fact_columns: List[str],
+    file_key: str,
+    stats: Optional[Dict[str, Any]],
+) -> None:
+    """Render the lookup-table upload, its join settings and match statistics."""
+    with st.expander("🔗 Enrich with a lookup table", expanded=lookup is not None):
+        st.file_uploader(
+            "Lookup table (CSV)",
+            type=["csv"],
+            key="lookup_file",
+            help="A table with one row per code (e.g. store ID or SKU) and its names, regions "
+                 "or other attributes; they become columns you can chart by"
+        )
+        if lookup is None:
+            return
+        left, right = st.columns(2)
+        left.selectbox(
+            "Key column in lookup table",
+            options=lookup["keys"],
+            index=lookup["keys"].index(lookup["key"]),
+            key=f"lookup_key_{lookup['digest'][:12]}",
+        )
+        right.selectbox(
+            "Matches column in your data",
+            options=fact_columns,
+            index=fact_columns.index(lookup["on"]),
+            key=f"lookup_on_{file_key[:12]}",
+        )
+        if lookup["index"].duplicate_keys:
+            st.caption(f"⚠️ {lookup['index'].duplicate_keys:,} repeated keys in the lookup table; the first row is used")
+        if stats is None:
+            return
+        share = stats["matched_rows"] / stats["rows"] if stats["rows"] else 0.0
+        st.caption(
+            f"🔗 Matched {stats['matched_rows']:,} of {stats['rows']:,} rows ({share:.1%}); "
+            f"added {', '.join(stats['columns']) or 'no columns'}"
+        )
+        if stats["unmatched_count"]:
+            st.caption(
+                f"⚠️ {stats['unmatched_count']:,} keys have no match, e.g. {', '.join(stats['unmatched_keys'])}"
+            )
+
+
+def dedupe_key(file_key: str) -> str:
+    """Widget key of the duplicate key columns; per upload like the overrides."""
+    return f"dedupe_subset_{file_key[:12]}"
+
+
+def render_duplicate_controls(columns: List[str], file_key: str, dropped: int, rows: int, projected: bool) -> None:
+    """Offer duplicate-row removal and report how many rows it dropped.
+
+    Args:
+        columns: Columns of the loaded dataset
+        file_key: Key of the current upload
+        dropped: Rows dropped with the current settings
+        rows: Rows before removal
+        projected: Whether only the columns in use were loaded
+    """
+    enabled = st.checkbox(
+        "🧹 Remove duplicate rows",
+        value=CFG.dedupe_rows,
+        key="dedupe_rows",
+        help="Drop rows that repeat an earlier row, e.g. from retried extracts, "
+             "so they don't inflate totals"
+    )
+    if not enabled:
+        return
+    st.multiselect(
+        "Identify duplicates by",
+        options=columns,
+        key=dedupe_key(file_key),
+        placeholder="All columns",
+        help="Rows with equal values in these columns count as duplicates; "
+             "leave empty to compare entire rows"
+    )
+    if dropped:
+        st.caption(
+            f"🧹 Removed {dropped:,} duplicate rows ({dropped / rows:.1%}); "
+            "KPIs, charts, the report and exports exclude them"
+        )
+    else:
+        st.caption("🧹 No duplicate rows found")
+    if projected:
+        st.caption("✂️ Only the loaded columns are compared, so rows differing elsewhere may count as duplicates")
+
+
+def render_duplicate_effect(with_duplicates: List[Tuple[str, str]], kpis: List[Tuple[str, str]]) -> None:
+    """Show the KPIs that changed when duplicate rows were removed."""
+    before = dict(with_duplicates)
+    changed = [(label, before[label], value) for label, value in kpis if before.get(label, value) != value]
+    if not changed:
+        return
+    with st.expander("🧹 Effect of removing duplicates on KPIs", expanded=True):
+        st.dataframe(
+            pd.DataFrame(changed, columns=["KPI", "With duplicates", "Without duplicates"]),
+            use_container_width=True,
+            hide_index=True,
+        )
+
+
+def render_column_overrides(graph: Graph, file_key: str) -> None:
+    """Let the user replace the inferred date, metric and category columns."""
+    profile = graph.get("profile")
+    inferred = graph.get("infer")
+    kinds = {"date_col": "date", "metric_col": "number", "category_col": "text"}
+    labels = {"date_col": "📅 Date column", "metric_col": "📊 Metric column", "category_col": "🏷️ Category column"}
+
+    with st.expander("✏️ Change detected columns", expanded=False):
+        cols = st.columns(3)
+        for col, role in zip(cols, ROLES):
+            candidates = profile.loc[profile["Kind"] == kinds[role], "Column"].tolist()
+            auto = f"Auto ({inferred.get(role) or 'none'})"
+            col.selectbox(
+                labels[role],
+                options=[""] + candidates,
+                format_func=lambda c, auto=auto: c or auto,
+                key=override_key(role, file_key),
+            )
+
+
+def render_detected_columns(
+    date_col: Optional[str],
+    metric_col: Optional[str],
+    category_col: Optional[str],
+) -> None:
+    """Show the detected date, metric and category columns."""
+    c1, c2, c3 = st.columns(3)
+
+    with c1:
+        if date_col:
+            c1.metric("📅 Date Column", date_col, help="Automatically detected date/time column")
+        else:
+            c1.metric("📅 Date Column", "Not found", delta="", delta_color="off")
+
+    with c2:
+        if metric_col:
+            c2.metric("📊 Metric Column", metric_col, help="Primary numeric column for analysis")
+        else:
+            c2.metric("📊 Metric Column", "Not found", delta="", delta_color="off")
+
+    with c3:
+        if category_col:
+            c3.metric("🏷️ Category Column", category_col, help="Categorical grouping column")
+        else:
+            c3.metric("🏷️ Category Column", "Not found", delta="", delta_color="off")
+
+
+def render_kpis(kpis: List[Tuple[str, str]]) -> None:
+    """Show KPI (label, value) tuples as metric cards."""
+    if kpis:
+        cols = st.columns(min(4, max(1, len(kpis))))
+        for i, (label, value) in enumerate(kpis):
+            with cols[i % len(cols)]:
+                st.metric(label, value)
+    else:
+        st.info("No KPIs available for this dataset")
+
+
+def render_report_export(
+    kpis: List[Tuple[str, str]],
+    df: pd.DataFrame,
+    report_charts: List[Tuple[str, bytes]],
+    summary_rows: Optional[List[List[str]]] = None,
+    allow_appendix: bool = True,
+    cached_report: Optional[Callable[[str], bytes]] = None,
+) -> None:
+    """Render the PDF report section and its download button.
+
+    Args:
+        kpis: KPI (label, value) tuples
+        df: Data shown in the report preview (and appendix)
+        report_charts: (title, image bytes) tuples of rendered charts
+        summary_rows: Optional formatted metric summary rows
+        allow_appendix: Offer the full-data appendix option
+        cached_report: Optional callable returning the memoized report
+            (without appendix) for a title
+    """
+    st.markdown("---")
+    st.markdown("## 📄 Export Report")
+
+    report_title = st.text_input(
+        "Report Title",
+        value="Management Report",
+        key="report_title",
+        help="Enter a custom title for your PDF report"
+    )
+
+    include_appendix = allow_appendix and st.checkbox(
+        "Include full-data appendix",
+        value=False,
+        key="report_appendix",
+        help="Append every row of the cleaned data to the PDF (slower for large files)"
+    )
+
+    if include_appendix:
+        render_appendix_report(report_title, kpis, df, report_charts, summary_rows)
+        return
+
+    with st.spinner("📝 Generating PDF report..."):
+        if cached_report is not None:
+            report_bytes = cached_report(report_title)
+        else:
+            report_bytes = render_report_stub(
+                report_title, kpis, df, charts=report_charts, metric_summary=summary_rows
+            )
+
+    st.download_button(
+        label="📥 Download PDF Report",
+        data=report_bytes,
+        file_name="management_report.pdf",
+        mime="application/pdf",
+        help="Download a professional PDF report with KPIs and data preview"
+    )
+
+
+def render_appendix_report(
+    report_title: str,
+    kpis: List[Tuple[str, str]],
+    df: pd.DataFrame,
+    report_charts: List[Tuple[str, bytes]],
+    summary_rows: Optional[List[List[str]]],
+) -> None:
+    """Render the download of the report with a full-data appendix, built only when asked to.
+
+    Laying out every row takes seconds for large files, so the PDF is built
+    when "Build" is clicked, written to a temporary file and kept for the
+    session until the data or anything else in the report changes.
+
+    Args:
+        report_title: Report title
+        kpis: KPI (label, value) tuples
+        df: Data shown in the report preview and appendix
+        report_charts: (title, image bytes) tuples of rendered charts
+        summary_rows: Optional formatted metric summary rows
+    """
+    contents = (report_title, kpis, report_charts, summary_rows)
+    prepared = st.session_state.get("appendix_report")
+    # A weak reference, so a built report doesn't keep replaced data alive
+    if prepared is not None and (prepared["source"]() is not df or prepared["contents"] != contents):
+        prepared["file"].close()
+        del st.session_state["appendix_report"]
+        prepared = None
+
+    if prepared is None:
+        if not st.button("⚙️ Build report with appendix", key="build_appendix_report"):
+            st.caption(f"The appendix lays out all {len(df):,} rows when you build the report")
+            return
+        progress = st.progress(0.0, text="Laying out appendix...")
+
+        def on_progress(done: int, total: int) -> None:
+            progress.progress(done / total if total else 1.0,
+                              text=f"Laying out appendix: {done:,} / {total:,} rows")
+
+        with st.spinner("📝 Generating PDF report..."):
+            report_bytes = render_report_stub(
+                report_title,
+                kpis,
+                df,
+                charts=report_charts,
+                metric_summary=summary_rows,
+                include_appendix=True,
+                appendix_chunk_rows=CFG.report_appendix_chunk_rows,
+                appendix_max_cols=CFG.report_appendix_max_cols,
+                progress_callback=on_progress,
+            )
+        progress.empty()
+        handle = tempfile.TemporaryFile()
+        handle.write(report_bytes)
+        handle.flush()
+        prepared = {"source": weakref.ref(df), "contents": contents, "file": handle}
+        st.session_state["appendix_report"] = prepared
+
+    st.download_button(
+        label="📥 Download PDF Report",
+        # The unbuffered file object, which download_button reads from the start
+        data=prepared["file"].raw,
+        file_name="management_report.pdf",
+        mime="application/pdf",
+        help="Download the PDF report with KPIs, charts and every row of the data"
+    )
+
+
+def render_dataset_export(df: pd.DataFrame) -> None:
+    """Render the cleaned-data download, serializing only when asked to.
+
+    The export is written chunk by chunk to a temporary file when "Prepare"
+    is clicked and kept for the session until the data or format changes,
+    so other widget interactions don't re-serialize the dataset. The file
+    is removed when it is replaced or the session ends.
+
+    Args:
+        df: Cleaned data to export
+    """
+    st.markdown("---")
+    st.markdown("## 💾 Download Cleaned Data")
+    export_fmt = st.selectbox(
+        "Format",
+        options=list(DATASET_FORMATS),
+        format_func=lambda f: DATASET_FORMATS[f]["label"],
+        key="export_format",
+        help="Parquet keeps parsed dates and compact dtypes, so downstream jobs skip re-parsing"
+    )
+    label = DATASET_FORMATS[export_fmt]["label"]
+
+    prepared = st.session_state.get("dataset_export")
+    # A weak reference, so a prepared export doesn't keep replaced data alive
+    if prepared is not None and (prepared["source"]() is not df or prepared["format"] != export_fmt):
+        prepared["file"].close()
+        del st.session_state["dataset_export"]
+        prepared = None
+
+    if prepared is None:
+        if not st.button(f"⚙️ Prepare {label} export", key="prepare_export"):
+            st.caption(f"The {len(df):,} cleaned rows are serialized when you prepare the export")
+            return
+        handle = tempfile.TemporaryFile()
+        try:
+            with st.spinner(f"💾 Preparing {label} export..."):
+                write_dataset(df, handle, export_fmt, CFG.export_chunk_rows)
+                handle.flush()
+        except (ImportError, ValueError) as exc:
+            handle.close()
+            st.warning(f"⚠️ {exc}")
+            return
+        prepared = {"source": weakref.ref(df), "format": export_fmt, "file": handle}
+        st.session_state["dataset_export"] = prepared
+
+    st.download_button(
+        label=f"📥 Download {label}",
+        # The unbuffered file object, which download_button reads from the start
+        data=prepared["file"].raw,
+        file_name=f"cleaned_data.{DATASET_FORMATS[export_fmt]['extension']}",
+        mime=DATASET_FORMATS[export_fmt]["mime"],
+        help="Download the cleaned dataset with parsed dates"
+    )
+
+
+@st.cache_resource(max_entries=CFG.sqlite_max_sources)
+def get_sqlite_source(path: str) -> SQLiteSource:
+    """Return the process-wide read-only connection pool for a SQLite file.
+
+    ``path`` must already be resolved inside ``CFG.sqlite_dir`` (see
+    ``resolve_database_path``); the least recently used pools are dropped
+    beyond ``CFG.sqlite_max_sources`` files.
+    """
+    return SQLiteSource(path, CFG.sqlite_pool_size)
+
+
+@st.cache_data(ttl=CFG.sqlite_cache_seconds, show_spinner=False)
+def load_sqlite_dashboard(path: str, table: Optional[str], query: Optional[str]) -> Dict[str, Any]:
+    """Detect columns on a row sample and aggregate a SQLite relation in SQL.
+
+    Only the first ``CFG.sqlite_sample_rows`` rows are fetched, for the
+    preview and column detection; KPIs, trend buckets and top categories are
+    computed by SQLite and only the aggregates are returned.
+
+    Args:
+        path: Path to the SQLite database file
+        table: Table or view to read, or None to use ``query``
+        query: Single SELECT statement, used when no table is given
+
+    Returns:
+        Dict with the sample, detected columns, KPIs, trend and category
+        aggregates (None when unavailable) and notes for the user
+    """
+    source = get_sqlite_source(path)
+    relation = source.relation(table, query)
+    sample_raw = source.fetch_sample(relation, CFG.sqlite_sample_rows)
+    sample = clean_dataframe(sample_raw)
+    sql_names = sql_column_names(sample_raw)
+    notes = []
+
+    # Formatted-number text can't be summed in SQL, so only native numbers are metrics
+    number_formats = sample.attrs.get("number_formats", {})
+    roles, _ = infer_column_roles(sample.drop(columns=list(number_formats)))
+    date_col, metric_col, category_col = roles["date_col"], roles["metric_col"], roles["category_col"]
+
+    if date_col:
+        expected = sample.attrs["date_formats"].get(date_col, {}).get("success", 1.0)
+        if source.date_parse_rate(relation, sql_names[date_col]) < expected - 0.1:
+            notes.append(f"Dates in '{date_col}' aren't ISO-8601 text, so SQLite can't aggregate them by time")
+            date_col = None
+
+    sql_date = sql_names[date_col] if date_col else None
+    sql_metric = sql_names[metric_col] if metric_col else None
+    summary = source.summary(relation, sql_date, sql_metric)
+
+    trend = None
+    if date_col and metric_col and summary["paired_rows"]:
+        span_days = (summary["paired_max"] - summary["paired_min"]).days
+        trend = source.bucket_sums(relation, sql_date, sql_metric, bucket_frequency(span_days))
+    # compute_kpis needs at least 10 dated metric values for the period change
+    period_sums = trend if summary["paired_rows"] >= 10 else None
+
+    kpis = format_kpis(
+        summary["rows"],
+        len(sample_raw.columns),
+        (summary["date_min"], summary["date_max"]) if date_col else None,
+        metric_col,
+        summary["total"],
+        summary["mean"],
+        period_sums,
+    )
+
+    categories = None
+    if category_col:
+        categories = source.top_categories(
+            relation, sql_names[category_col], sql_metric, CFG.top_n_categories
+        ).rename_axis(category_col)
+
+    return {
+        "rows": summary["rows"],
+        "sample": sample,
+        "sample_raw": sample_raw,
+        "date_col": date_col,
+        "metric_col": metric_col,
+        "category_col": category_col,
+        "kpis": kpis,
+        "trend": trend,
+        "categories": categories,
+        "notes": notes,
+    }
+
+
+def sqlite_dashboard() -> None:
+    """Dashboard for a SQLite table or query, aggregated inside SQLite."""
+    if not CFG.sqlite_dir or not os.path.isdir(CFG.sqlite_dir):
+        st.info(f"🗄️ Place SQLite databases in the '{CFG.sqlite_dir}' directory on the server to read them here")
+        return
+    name = st.text_input(
+        "🗄️ SQLite database file",
+        placeholder="sales.db",
+        help=f"Path of a SQLite file inside the server's '{CFG.sqlite_dir}' directory; it is opened read-only"
+    )
+    if not name:
+        st.info("👆 Enter the name of a SQLite database to get started")
+        return
+
+    try:
+        path = resolve_database_path(CFG.sqlite_dir, name)
+        source = get_sqlite_source(path)
+        tables = source.tables()
+    except (OSError, ValueError, sqlite3.Error) as exc:
+        st.error(f"⚠️ Could not open database: {exc}")
+        return
+
+    read_from = st.radio("Read from", ["Table", "Query"], horizontal=True)
+    table = query = None
+    if read_from == "Table":
+        if not tables:
+            st.warning("⚠️ This database has no tables")
+            return
+        table = st.selectbox("Table", tables)
+    else:
+        query = st.text_area("SQL query", placeholder="SELECT * FROM sales WHERE region = 'North'")
+        if not query.strip():
+            st.info("👆 Enter a SELECT statement")
+            return
+
+    try:
+        with st.spinner("⚙️ Aggregating in SQLite..."):
+            result = load_sqlite_dashboard(path, table, query)
+    except (ValueError, sqlite3.Error) as exc:
+        st.error(f"⚠️ {exc}")
+        return
+
+    date_col = result["date_col"]
+    metric_col = result["metric_col"]
+    category_col = result["category_col"]
+    sample = result["sample"]
+    st.success(f"✅ Aggregated {result['rows']:,} rows in SQLite")
+
+    # Section 1: Preview
+    st.markdown("---")
+    st.markdown("## 👁️ Data Preview")
+    with st.expander(f"📋 View raw data (first {CFG.max_preview_rows} rows)", expanded=False):
+        st.dataframe(result["sample_raw"].head(CFG.max_preview_rows), use_container_width=True)
+
+    # Section 2: Inferred columns
+    st.markdown("---")
+    st.markdown("## 🔍 Detected Columns")
+    render_detected_columns(date_col, metric_col, category_col)
+    st.caption(f"🔎 Detected on the first {len(sample):,} rows; aggregates cover every row")
+    for note in result["notes"]:
+        st.caption(f"ℹ️ {note}")
+
+    # Section 3: KPIs
+    st.markdown("---")
+    st.markdown("## 📈 Key Performance Indicators")
+    kpis = result["kpis"]
+    render_kpis(kpis)
+
+    # Section 4: Charts
+    st.markdown("---")
+    st.markdown("## 📊 Visualizations")
+    left, right = st.columns(2)
+    report_charts = []
+
+    with left:
+        st.markdown("### 📈 Trend Over Time")
+        if result["trend"] is not None:
+            with st.spinner("Creating trend chart..."):
+                trend_bytes = render_figure(
+                    plot_trend_chart(result["trend"], metric_col), CFG.chart_format, CFG.chart_dpi
+                )
+                show_chart(trend_bytes)
+                report_charts.append((f"{metric_col} over time", trend_bytes))
+        else:
+            st.warning("⚠️ Trend chart requires a date column and numeric metric column")
+
+    with right:
+        st.markdown("### 🏷️ Category Breakdown")
+        if result["categories"] is not None and len(result["categories"]):
+            with st.spinner("Creating category chart..."):
+                cat_bytes = render_figure(
+                    plot_category_chart(result["categories"], category_col, metric_col, CFG.top_n_categories),
+                    CFG.chart_format,
+                    CFG.chart_dpi,
+                )
+                show_chart(cat_bytes)
+                report_charts.append((f"Top {CFG.top_n_categories} {category_col}", cat_bytes))
+        else:
+            st.warning("⚠️ Category chart requires a categorical column")
+
+    # Section 5: Export (the preview comes from the sample; no row-level appendix)
+    render_report_export(kpis, sample, report_charts, allow_appendix=False)
+
+
 def sidebar_controls() -> None:
     """Render sidebar settings."""
     st.sidebar.markdown("### ⚙️ Settings")
@@ -412,6 +1214,27 @@ def sidebar_controls() -> None:
     st.sidebar.markdown(f"**📁 Max Upload:** {CFG.max_upload_mb}MB")
     st.sidebar.markdown(f"**👁️ Preview Rows:** {CFG.max_preview_rows}")
     st.sidebar.markdown(f"**📊 Top Categories:** {CFG.top_n_categories}")
+    st.sidebar.checkbox(
+        "Arrow-backed dtypes",
+        value=CFG.use_arrow_dtypes,
+        key="use_arrow_dtypes",
+        help="Parse with the pyarrow engine into Arrow dtypes: faster parsing and "
+             "much less memory for text-heavy files"
+    )
+    st.sidebar.checkbox(
+        "Load only columns in use",
+        value=CFG.projected_loading,
+        key="projected_loading",
+        help=f"Detect columns on the first {CFG.projected_sample_rows:,} rows, then read just the "
+             "date, metric and category columns: much faster for wide files"
+    )
+    st.sidebar.checkbox(
+        "Compute sections in parallel",
+        value=CFG.concurrent_sections,
+        key="concurrent_sections",
+        help="Compute KPIs, charts and the PDF report at the same time and show each "
+             "section as soon as it is ready"
+    )
     st.sidebar.markdown("---")
     st.sidebar.markdown("### 📖 About")
     st.sidebar.markdown(
@@ -422,6 +1245,187 @@ def sidebar_controls() -> None:
     st.sidebar.caption("Built with Streamlit & Python")
 
 
+def render_dashboard(graph: Graph, df: pd.DataFrame, meta: Dict[str, Any]) -> None:
+    """Render the dashboard sections of a loaded dataset from the session's graph.
+
+    Everything downstream of loading is a memoized graph: reruns recompute
+    only the stages whose inputs (dataset, column overrides, options) changed.
+
+    Args:
+        graph: This session's dashboard graph, held with ``in_use``
+        df: Cleaned dataset
+        meta: Dataset metadata, including its "file_key"
+    """
+    file_key = meta["file_key"]
+    graph.take_recomputed()
+    set_dataset(graph, df, meta, file_key)
+    graph.set_input("top_n", CFG.top_n_categories)
+    graph.set_input("chart_format", CFG.chart_format)
+    graph.set_input("chart_dpi", CFG.chart_dpi)
+    # Override widgets are drawn below the detected columns; their state from
+    # the last interaction is already in session_state
+    for role in ROLES:
+        graph.set_input(override_input(role), st.session_state.get(override_key(role, file_key)) or None)
+    loaded_columns = list(df.columns)
+    lookup = current_lookup(loaded_columns, file_key, graph.get("category_col"))
+    if lookup is None:
+        graph.set_input("lookup", None, token=None)
+    else:
+        graph.set_input("lookup", lookup["index"], token=(lookup["digest"], lookup["key"]))
+        graph.set_input("lookup_on", lookup["on"])
+    graph.set_input("dedupe", bool(st.session_state.get("dedupe_rows", CFG.dedupe_rows)))
+    graph.set_input("dedupe_subset", tuple(st.session_state.get(dedupe_key(file_key)) or ()) or None)
+    date_col = graph.get("date_col")
+    metric_col = graph.get("metric_col")
+    category_col = graph.get("category_col")
+    st.success(f"✅ Loaded {meta['raw_rows']:,} rows and {meta['raw_columns']} columns")
+
+    # Section 1: Preview
+    st.markdown("---")
+    st.markdown("## 👁️ Data Preview")
+    raw_preview = meta.get("raw_preview")
+    if raw_preview is not None:
+        with st.expander("📋 View raw data (first 25 rows)", expanded=False):
+            st.dataframe(raw_preview, use_container_width=True)
+    else:
+        with st.expander("📋 View data (first 25 rows, cleaned)", expanded=False):
+            st.dataframe(df.head(CFG.max_preview_rows), use_container_width=True)
+
+    # Section 2: Inferred columns
+    st.markdown("---")
+    st.markdown("## 🔍 Detected Columns")
+    render_detected_columns(date_col, metric_col, category_col)
+    render_column_overrides(graph, file_key)
+
+    number_formats = meta.get("number_formats") or {}
+    if number_formats:
+        converted = ", ".join(
+            f"{col} ({fmt['unit'] or 'number'}, {fmt['thousands']} thousands / {fmt['decimal']} decimal)"
+            for col, fmt in number_formats.items()
+        )
+        st.caption(f"🔢 Converted formatted text to numbers: {converted}")
+    if meta.get("projected"):
+        st.caption(
+            f"✂️ Only the detected columns were loaded ({len(df.columns)} of {meta['raw_columns']}); "
+            "metric summaries and exports cover these columns"
+        )
+    if meta.get("schema_reused"):
+        st.caption("🧠 Column layout recognized from an earlier upload; remembered formats and columns were reused")
+    elif meta.get("schema_hints_rejected"):
+        st.caption(
+            "🧠 Column layout recognized from an earlier upload, but its remembered formats no longer "
+            "fit every value; formats were detected afresh"
+        )
+
+    with st.spinner("🔗 Joining lookup table..."):
+        enriched = graph.get("enriched")
+    render_lookup_controls(lookup, loaded_columns, file_key, graph.get("enrichment_stats"))
+
+    df = graph.get("data")
+    dropped = graph.get("duplicates_dropped")
+    render_duplicate_controls(list(enriched.columns), file_key, dropped, len(enriched), bool(meta.get("projected")))
+
+    # Widgets below feed graph inputs; their values from the last
+    # interaction are read up front so every section can start right away
+    show_all_metrics = bool(st.session_state.get("show_all_metrics", CFG.multi_metric_kpis))
+    include_appendix = bool(st.session_state.get("report_appendix", False))
+    graph.set_input("show_metric_summary", show_all_metrics)
+    graph.set_input("report_title", st.session_state.get("report_title", "Management Report"))
+
+    sections = ["kpis", "metric_summary"]
+    if dropped:
+        sections.append("kpis_with_duplicates")
+    if date_col and metric_col:
+        sections.append("trend_chart")
+    if category_col:
+        sections.append("category_chart")
+    if not include_appendix:
+        sections.append("report")
+
+    # Section 3: KPIs
+    st.markdown("---")
+    st.markdown("## 📈 Key Performance Indicators")
+    kpi_slot = st.empty()
+    kpi_slot.caption("⏳ Computing KPIs...")
+    duplicates_slot = st.container()
+
+    st.checkbox(
+        "Show KPIs for all numeric columns",
+        value=CFG.multi_metric_kpis,
+        key="show_all_metrics",
+        help="Totals, averages, min/max and period change for every numeric column, "
+             "computed in one pass"
+    )
+    summary_slot = st.empty()
+
+    # Section 4: Charts
+    st.markdown("---")
+    st.markdown("## 📊 Visualizations")
+    left, right = st.columns(2)
+    slots = {"kpis": kpi_slot, "metric_summary": summary_slot}
+
+    with left:
+        st.markdown("### 📈 Trend Over Time")
+        if date_col and metric_col:
+            slots["trend_chart"] = st.empty()
+            slots["trend_chart"].caption("⏳ Creating trend chart...")
+        else:
+            st.warning("⚠️ Trend chart requires a date column and numeric metric column")
+
+    with right:
+        st.markdown("### 🏷️ Category Breakdown")
+        if category_col:
+            slots["category_chart"] = st.empty()
+            slots["category_chart"].caption("⏳ Creating category chart...")
+        else:
+            st.warning("⚠️ Category chart requires a categorical column")
+
+    concurrent = bool(st.session_state.get("concurrent_sections", CFG.concurrent_sections))
+    results: Dict[str, Any] = {}
+    for name, value in iter_sections(graph, sections, concurrent):
+        results[name] = value
+        if name == "kpis":
+            with kpi_slot.container():
+                render_kpis(value)
+        elif name == "metric_summary":
+            if value is not None:
+                summary_slot.dataframe(
+                    pd.DataFrame(value[1:], columns=value[0]),
+                    use_container_width=True,
+                    hide_index=True,
+                )
+            elif show_all_metrics:
+                summary_slot.info("No numeric columns to summarize")
+        elif name in ("trend_chart", "category_chart"):
+            with slots[name].container():
+                show_chart(value)
+
+    if results.get("kpis_with_duplicates") is not None:
+        with duplicates_slot:
+            render_duplicate_effect(results["kpis_with_duplicates"], results["kpis"])
+
+    # Section 5: Export
+    def cached_report(title: str) -> bytes:
+        graph.set_input("report_title", title)
+        return graph.get("report")
+
+    render_report_export(
+        results["kpis"], df, graph.get("report_charts"), results["metric_summary"], cached_report=cached_report
+    )
+
+    # Section 6: Cleaned data download
+    render_dataset_export(df)
+
+    # Debug section
+    with st.expander("🔧 Advanced: View cleaned data"):
+        st.dataframe(df.head(CFG.max_preview_rows), use_container_width=True)
+        st.markdown("**Column profile**")
+        st.dataframe(graph.get("profile"), use_container_width=True, hide_index=True)
+        recomputed = graph.take_recomputed()
+        st.caption(f"♻️ Stages recomputed on this run: {', '.join(recomputed) if recomputed else 'none'}")
+
+
+
 def main() -> None:
     """Main application entry point."""
     # Check if custom logo exists
@@ -464,6 +1468,17 @@ def main() -> None:
         unsafe_allow_html=True
     )
 
+    source = st.radio(
+        "Data source",
+        ["📁 CSV upload", "🗄️ SQLite database"],
+        horizontal=True,
+        key="data_source",
+    )
+    if source == "🗄️ SQLite database":
+        cancel_pipeline_job()
+        sqlite_dashboard()
+        return
+
     uploaded = st.file_uploader(
         "📁 Upload Your CSV File",
         type=["csv"],
@@ -472,6 +1487,7 @@ def main() -> None:
     )
 
     if not uploaded:
+        cancel_pipeline_job()
         st.info("👆 Upload a CSV file to get started with your data analysis")
 
         # Add helpful example
@@ -505,106 +1521,17 @@ def main() -> None:
         st.error(f"⚠️ File too large. Please upload a CSV under {CFG.max_upload_mb}MB.")
         return
 
-    with st.spinner("🔄 Reading your CSV file..."):
-        df_raw = read_csv(uploaded)
-
-    st.success(f"✅ Loaded {len(df_raw):,} rows and {len(df_raw.columns)} columns")
-
-    # Section 1: Preview
-    st.markdown("---")
-    st.markdown("## 👁️ Data Preview")
-    with st.expander("📋 View raw data (first 25 rows)", expanded=False):
-        st.dataframe(df_raw.head(CFG.max_preview_rows), use_container_width=True)
-
-    with st.spinner("🧹 Cleaning data and detecting column types..."):
-        df = clean_dataframe(df_raw)
-        date_col = infer_date_column(df)
-        metric_col = infer_metric_column(df)
-        category_col = infer_category_column(df)
-
-    # Section 2: Inferred columns
-    st.markdown("---")
-    st.markdown("## 🔍 Detected Columns")
-    c1, c2, c3 = st.columns(3)
-
-    with c1:
-        if date_col:
-            c1.metric("📅 Date Column", date_col, help="Automatically detected date/time column")
-        else:
-            c1.metric("📅 Date Column", "Not found", delta="", delta_color="off")
-
-    with c2:
-        if metric_col:
-            c2.metric("📊 Metric Column", metric_col, help="Primary numeric column for analysis")
-        else:
-            c2.metric("📊 Metric Column", "Not found", delta="", delta_color="off")
-
-    with c3:
-        if category_col:
-            c3.metric("🏷️ Category Column", category_col, help="Categorical grouping column")
-        else:
-            c3.metric("🏷️ Category Column", "Not found", delta="", delta_color="off")
-
-    # Section 3: KPIs
-    st.markdown("---")
-    st.markdown("## 📈 Key Performance Indicators")
-    kpis = compute_kpis(df, date_col, metric_col)
-
-    if kpis:
-        cols = st.columns(min(4, max(1, len(kpis))))
-        for i, (label, value) in enumerate(kpis):
-            with cols[i % len(cols)]:
-                st.metric(label, value)
-    else:
-        st.info("No KPIs available for this dataset")
-
-    # Section 4: Charts
-    st.markdown("---")
-    st.markdown("## 📊 Visualizations")
-    left, right = st.columns(2)
-
-    with left:
-        st.markdown("### 📈 Trend Over Time")
-        if date_col and metric_col:
-            with st.spinner("Creating trend chart..."):
-                fig_trend = build_trend_chart(df, date_col, metric_col)
-                st.pyplot(fig_trend, clear_figure=True)
-        else:
-            st.warning("⚠️ Trend chart requires a date column and numeric metric column")
-
-    with right:
-        st.markdown("### 🏷️ Category Breakdown")
-        if category_col:
-            with st.spinner("Creating category chart..."):
-                fig_cat = build_category_chart(df, category_col, metric_col, CFG.top_n_categories)
-                st.pyplot(fig_cat, clear_figure=True)
-        else:
-            st.warning("⚠️ Category chart requires a categorical column")
-
-    # Section 5: Export
-    st.markdown("---")
-    st.markdown("## 📄 Export Report")
-
-    report_title = st.text_input(
-        "Report Title",
-        value="Management Report",
-        help="Enter a custom title for your PDF report"
-    )
-
-    with st.spinner("📝 Generating PDF report..."):
-        report_bytes = render_report_stub(report_title, kpis, df)
-
-    st.download_button(
-        label="📥 Download PDF Report",
-        data=report_bytes,
-        file_name="management_report.pdf",
-        mime="application/pdf",
-        help="Download a professional PDF report with KPIs and data preview"
-    )
-
-    # Debug section
-    with st.expander("🔧 Advanced: View cleaned data"):
-        st.dataframe(df.head(CFG.max_preview_rows), use_container_width=True)
+    # Loading runs as a background job; identical uploads are shared across
+    # sessions and misses fall back to the on-disk cache before a full parse
+    df, meta = get_dataset(uploaded)
+    file_key = meta["file_key"]
+
+    graph = get_dashboard_graph()
+    with graph.in_use():
+        render_dashboard(graph, df, meta)
+    # What the graph derived from the dataset counts against this session's
+    # store budget; if the store evicts the dataset, the graph releases it too
+    get_dataset_store().charge(file_key, get_session_id(), derived_nbytes(graph))
 
 
 if __name__ == "__main__":
@@ -9,6 +9,31 @@ class AppConfig:
     max_upload_mb: int = 10
     max_preview_rows: int = 25
     top_n_categories: int = 5
+    use_arrow_dtypes: bool = False
+    multi_metric_kpis: bool = False
+    projected_loading: bool = False
+    projected_sample_rows: int = 10_000
+    dedupe_rows: bool = False
+    chart_format: str = "png"
+    chart_dpi: int = 110
+    report_appendix_chunk_rows: int = 500
+    report_appendix_max_cols: int = 8
+    export_chunk_rows: int = 50_000
+    cache_dir: str = ".datacanvas_cache"
+    cache_max_mb: int = 512
+    schema_cache_max_entries: int = 256
+    store_max_mb: int = 1024
+    store_session_max_mb: int = 256
+    job_workers: int = 2
+    job_max_pending: int = 8
+    job_poll_seconds: float = 0.25
+    concurrent_sections: bool = False
+    section_workers: int = 4
+    sqlite_dir: str = "databases"
+    sqlite_max_sources: int = 8
+    sqlite_pool_size: int = 4
+    sqlite_sample_rows: int = 1_000
+    sqlite_cache_seconds: int = 60
 
 
 CFG = AppConfig()
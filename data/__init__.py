@@ -1,11 +1,41 @@
 """Data processing module."""
-from .cleaning import read_csv, clean_dataframe
-from .inference import infer_date_column, infer_metric_column, infer_category_column
+from .cache import DatasetCache, content_hash
+from .cleaning import read_csv, clean_dataframe, drop_duplicate_rows, find_duplicate_rows, normalize_column_names
+from .enrichment import LookupIndex, lookup_key_candidates
+from .files import atomic_write
+from .inference import (
+    infer_date_column,
+    infer_metric_column,
+    infer_category_column,
+    infer_column_roles,
+    profile_columns,
+)
+from .projection import read_csv_projected
+from .schema import SchemaCache, schema_fingerprint
+from .sqlite_source import SQLiteSource, resolve_database_path, sql_column_names
+from .store import DatasetStore
 
 __all__ = [
+    "DatasetCache",
+    "DatasetStore",
+    "LookupIndex",
+    "SchemaCache",
+    "SQLiteSource",
+    "atomic_write",
+    "content_hash",
+    "schema_fingerprint",
+    "sql_column_names",
+    "resolve_database_path",
     "read_csv",
+    "read_csv_projected",
     "clean_dataframe",
+    "drop_duplicate_rows",
+    "find_duplicate_rows",
+    "normalize_column_names",
     "infer_date_column",
     "infer_metric_column",
     "infer_category_column",
+    "infer_column_roles",
+    "profile_columns",
+    "lookup_key_candidates",
 ]
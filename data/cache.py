@@ -0,0 +1,176 @@
+"""Persistent on-disk cache of cleaned datasets."""
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from .files import atomic_write
+
+# Bump when cleaning or inference output changes so stale entries are ignored
+CACHE_VERSION = 2
+
+_DATA_SUFFIX = ".arrow"
+_META_SUFFIX = ".json"
+
+
+def content_hash(data: bytes, *parts: str) -> str:
+    """Hash uploaded file contents (plus any options affecting the result).
+
+    Args:
+        data: Raw file bytes
+        *parts: Extra strings that change the cleaned output, e.g. option flags
+
+    Returns:
+        Hex digest usable as a cache key
+    """
+    h = hashlib.blake2b(digest_size=20)
+    h.update(f"v{CACHE_VERSION}".encode())
+    for part in parts:
+        h.update(b"\0" + part.encode("utf-8"))
+    h.update(b"\0")
+    h.update(data)
+    return h.hexdigest()
+
+
+class DatasetCache:
+    """Content-addressed cache of cleaned DataFrames stored as Arrow IPC files.
+
+    Each entry is an uncompressed Arrow IPC file holding the cleaned frame,
+    read back through a memory map, plus a JSON sidecar holding metadata such
+    as inference results. Entries are evicted least-recently-used first once
+    the directory exceeds ``max_bytes``; file modification times record use.
+
+    Args:
+        directory: Cache directory, created if missing
+        max_bytes: Total size budget for all entries
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _paths(self, key: str) -> Tuple[str, str]:
+        base = os.path.join(self.directory, key)
+        return base + _DATA_SUFFIX, base + _META_SUFFIX
+
+    def get(self, key: str) -> Optional[Tuple[pd.DataFrame, Dict[str, Any]]]:
+        """Load a cached frame and its metadata, or None on a miss.
+
+        Args:
+            key: Cache key from ``content_hash``
+
+        Returns:
+            (DataFrame, metadata) tuple, or None if the entry is missing or unreadable
+        """
+        import pyarrow as pa
+
+        data_path, meta_path = self._paths(key)
+        try:
+            with open(meta_path, "r", encoding="utf-8") as fh:
+                meta = json.load(fh)
+            with pa.memory_map(data_path, "r") as source:
+                table = pa.ipc.open_file(source).read_all()
+            # Arrow-backed frames are restored as such instead of as NumPy/object
+            types_mapper = pd.ArrowDtype if meta.get("dtype_backend") == "pyarrow" else None
+            df = table.to_pandas(types_mapper=types_mapper)
+        except (OSError, ValueError, pa.ArrowException):
+            self._remove(key)
+            return None
+
+        # Mark as recently used
+        for path in (data_path, meta_path):
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+        return df, meta
+
+    def put(self, key: str, df: pd.DataFrame, meta: Dict[str, Any]) -> bool:
+        """Store a cleaned frame and its metadata.
+
+        Frames that Arrow cannot represent (e.g. mixed-type object columns)
+        are skipped rather than raising.
+
+        Args:
+            key: Cache key from ``content_hash``
+            df: Cleaned DataFrame
+            meta: JSON-serializable metadata (inference results, source shape);
+                ``dtype_backend="pyarrow"`` restores Arrow-backed dtypes on load
+
+        Returns:
+            True if the entry was written
+        """
+        import pyarrow as pa
+
+        try:
+            table = pa.Table.from_pandas(df)
+        except (pa.ArrowException, TypeError, ValueError):
+            return False
+
+        data_path, meta_path = self._paths(key)
+        with self._lock:
+            try:
+                atomic_write(data_path, lambda fh: self._write_ipc(fh, table))
+                atomic_write(
+                    meta_path,
+                    lambda fh: fh.write(json.dumps(meta, default=str).encode("utf-8")),
+                )
+            except OSError:
+                self._remove(key)
+                return False
+            self._evict()
+        return True
+
+    @staticmethod
+    def _write_ipc(fh, table) -> None:
+        import pyarrow as pa
+
+        with pa.ipc.new_file(fh, table.schema) as writer:
+            writer.write_table(table)
+
+    def _remove(self, key: str) -> None:
+        for path in self._paths(key):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _entries(self) -> List[Tuple[float, int, str]]:
+        """Return (last_used, size, key) for every complete entry."""
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(_DATA_SUFFIX):
+                continue
+            key = name[: -len(_DATA_SUFFIX)]
+            data_path, meta_path = self._paths(key)
+            try:
+                data_stat = os.stat(data_path)
+                meta_stat = os.stat(meta_path)
+            except OSError:
+                continue
+            entries.append((data_stat.st_mtime, data_stat.st_size + meta_stat.st_size, key))
+        return entries
+
+    def size_bytes(self) -> int:
+        """Total size of all cache entries in bytes."""
+        return sum(size for _, size, _ in self._entries())
+
+    def _evict(self) -> None:
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, key in entries:
+            if total <= self.max_bytes:
+                break
+            self._remove(key)
+            total -= size
+
+    def clear(self) -> None:
+        """Remove every entry from the cache."""
+        with self._lock:
+            for _, _, key in self._entries():
+                self._remove(key)
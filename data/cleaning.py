@@ -1,33 +1,486 @@
 """CSV reading and data cleaning utilities."""
+import io
+import re
+import warnings
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+
+import numpy as np
 import pandas as pd
 
+try:
+    from pandas.tseries.api import guess_datetime_format
+except ImportError:  # pandas < 2.2
+    from pandas._libs.tslibs.parsing import guess_datetime_format
+
+from .dtypes import is_arrow_date_dtype, is_arrow_dtype, is_text_dtype, to_arrow_timestamp
+
+ProgressCallback = Callable[[int, int], None]
+
+_CURRENCY_SYMBOLS = "$€£¥₹"
+
+# Whole-value patterns for formatted numbers: optional accounting parentheses,
+# sign, currency symbol or percent, and either "1,234.50" or "1.234,50" style
+_NUMBER_PATTERNS = {
+    "en": (
+        rf"\(?[-+]?\s*[{_CURRENCY_SYMBOLS}]?\s*[-+]?"
+        rf"(?:\d{{1,3}}(?:,\d{{3}})+|\d+)(?:\.\d+)?\s*[{_CURRENCY_SYMBOLS}%]?\)?"
+    ),
+    "de": (
+        rf"\(?[-+]?\s*[{_CURRENCY_SYMBOLS}]?\s*[-+]?"
+        rf"(?:\d{{1,3}}(?:\.\d{{3}})+|\d+)(?:,\d+)?\s*[{_CURRENCY_SYMBOLS}%]?\)?"
+    ),
+}
+_NUMBER_SEPARATORS = {"en": (".", ","), "de": (",", ".")}
+_NUMBER_STRIP = rf"[\s{_CURRENCY_SYMBOLS}%()+]"
+
+# Date columns with more distinct values than this share of rows are parsed
+# directly; below it, parsing only the distinct values is much cheaper
+_DATE_UNIQUE_RATIO = 0.5
+_DATE_RATIO_SAMPLE = 10_000
+
+
+class _ProgressReader(io.RawIOBase):
+    """Binary file wrapper that reports how many bytes the parser has consumed.
+
+    The callback may raise to abort parsing, which is how background jobs
+    are cancelled mid-read.
+    """
+
+    def __init__(self, file, callback: ProgressCallback):
+        super().__init__()
+        self._file = file
+        self._callback = callback
+        pos = file.tell()
+        self.total = file.seek(0, io.SEEK_END)
+        file.seek(pos)
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        return self._file.seek(offset, whence)
+
+    def tell(self) -> int:
+        return self._file.tell()
+
+    def readinto(self, buffer) -> int:
+        data = self._file.read(len(buffer))
+        n = len(data)
+        buffer[:n] = data
+        self._callback(self._file.tell(), self.total)
+        return n
 
-def read_csv(file) -> pd.DataFrame:
+
+def _has_binary_columns(df: pd.DataFrame) -> bool:
+    """Return True if the pyarrow parser fell back to binary for invalid UTF-8."""
+    import pyarrow as pa
+
+    return any(
+        is_arrow_dtype(dtype) and pa.types.is_binary(dtype.pyarrow_dtype)
+        for dtype in df.dtypes
+    )
+
+
+def read_csv(
+    file,
+    progress_callback: Optional[ProgressCallback] = None,
+    use_arrow: bool = False,
+    **read_kwargs: Any,
+) -> pd.DataFrame:
     """Read a CSV upload safely with encoding fallback.
 
+    With ``use_arrow`` the file is parsed by the multithreaded pyarrow engine
+    into Arrow-backed dtypes: strings are stored in Arrow buffers instead of
+    one Python object per cell and integer columns stay integers when they
+    contain missing values. Bounded reads (``nrows``) use the C parser, which
+    unlike the pyarrow engine can stop early, with the same Arrow dtypes.
+
     Args:
         file: Uploaded file object
+        progress_callback: Optional callable receiving (bytes_read, total_bytes)
+            as the parser consumes the file
+        use_arrow: Parse with the pyarrow engine into pyarrow-backed dtypes
+        **read_kwargs: Extra ``pd.read_csv`` arguments (e.g. ``nrows``,
+            ``usecols``, ``dtype``)
 
     Returns:
         DataFrame containing the CSV data
     """
+    if progress_callback is not None:
+        file = _ProgressReader(file, progress_callback)
+
+    if use_arrow and read_kwargs.get("nrows") is None:
+        df = pd.read_csv(file, engine="pyarrow", dtype_backend="pyarrow", **read_kwargs)
+        # pyarrow reads invalid UTF-8 as binary rather than raising
+        if _has_binary_columns(df):
+            file.seek(0)
+            df = pd.read_csv(
+                file, engine="pyarrow", dtype_backend="pyarrow", encoding="latin-1", **read_kwargs
+            )
+        return df
+
+    if use_arrow:
+        read_kwargs["dtype_backend"] = "pyarrow"
     try:
-        df = pd.read_csv(file)
+        df = pd.read_csv(file, **read_kwargs)
     except UnicodeDecodeError:
         file.seek(0)
-        df = pd.read_csv(file, encoding="latin-1")
+        df = pd.read_csv(file, encoding="latin-1", **read_kwargs)
     return df
 
 
-def clean_dataframe(df: pd.DataFrame) -> pd.DataFrame:
+def _parse_dates(series: pd.Series, **kwargs) -> pd.Series:
+    """``pd.to_datetime(series, errors="coerce", **kwargs)``, parsing each distinct value once.
+
+    The column is factorized, only the distinct strings are parsed, and the
+    results are broadcast back through the integer codes. Columns whose
+    sampled cardinality is high are parsed directly instead, since
+    factorizing them would cost more than it saves.
+
+    Args:
+        series: Text column
+        **kwargs: Extra arguments for ``pd.to_datetime`` (e.g. ``format``, ``dayfirst``)
+
+    Returns:
+        Parsed series with the same index and name
+    """
+    head = series.iloc[:_DATE_RATIO_SAMPLE]
+    if head.nunique(dropna=True) > _DATE_UNIQUE_RATIO * max(1, head.notna().sum()):
+        return pd.to_datetime(series, errors="coerce", **kwargs)
+
+    codes, uniques = pd.factorize(series, use_na_sentinel=True)
+    if len(uniques) > _DATE_UNIQUE_RATIO * max(1, len(series)):
+        return pd.to_datetime(series, errors="coerce", **kwargs)
+
+    parsed = pd.to_datetime(pd.Series(uniques), errors="coerce", **kwargs)
+    # Missing values have code -1, which take() fills with NaT
+    values = parsed.array.take(codes, allow_fill=True)
+    return pd.Series(values, index=series.index, name=series.name)
+
+
+def _detect_number_format(sample: pd.Series) -> Optional[Dict[str, Optional[str]]]:
+    """Detect formatted numbers ("$1,234.50", "12%", "1.234,50") in a text sample.
+
+    Returns the format when at least 90% of the sample matches one locale's
+    pattern, the values use a single unit, and at least one value carries a
+    currency symbol, percent sign or thousands separator (plain numeric text
+    is left alone).
+
+    Args:
+        sample: Non-null string values
+
+    Returns:
+        Dict with "locale", "unit", "decimal" and "thousands" keys, or None
+    """
+    values = sample.str.strip()
+    rates = {
+        locale: values.str.fullmatch(pattern).mean()
+        for locale, pattern in _NUMBER_PATTERNS.items()
+    }
+    # Ambiguous values such as "1.234" match both; prefer "en" on ties
+    locale = max(rates, key=lambda loc: (rates[loc], loc == "en"))
+    if rates[locale] < 0.9:
+        return None
+
+    units = {ch for ch in _CURRENCY_SYMBOLS + "%" if values.str.contains(ch, regex=False).any()}
+    if len(units) > 1:
+        return None
+    decimal, thousands = _NUMBER_SEPARATORS[locale]
+    has_thousands = values.str.contains(rf"\d{re.escape(thousands)}\d{{3}}", regex=True).any()
+    if not units and not has_thousands:
+        return None
+
+    return {
+        "locale": locale,
+        "unit": units.pop() if units else None,
+        "decimal": decimal,
+        "thousands": thousands,
+    }
+
+
+def _coerce_formatted_numbers(series: pd.Series, fmt: Dict[str, Optional[str]]) -> pd.Series:
+    """Convert a text column of formatted numbers using vectorized string ops.
+
+    Values that don't match the detected format become missing. Accounting
+    parentheses make values negative; percent values keep their scale
+    ("12%" becomes 12.0).
+
+    Args:
+        series: Text column
+        fmt: Format returned by ``_detect_number_format``
+
+    Returns:
+        Numeric series (Arrow-backed if the input was)
+    """
+    import pyarrow as pa
+
+    arrow_input = is_arrow_dtype(series.dtype)
+    text = series
+    if not arrow_input:
+        # Arrow string kernels are several times faster than object .str methods
+        try:
+            text = series.astype(pd.ArrowDtype(pa.string()))
+        except (pa.ArrowException, TypeError, ValueError):
+            text = series.where(series.isna(), series.astype(str)).astype(pd.ArrowDtype(pa.string()))
+
+    text = text.str.strip()
+    valid = text.str.fullmatch(_NUMBER_PATTERNS[fmt["locale"]]).fillna(False).astype(bool)
+    negative = text.str.startswith("(").fillna(False).astype(bool)
+
+    digits = text.str.replace(_NUMBER_STRIP, "", regex=True)
+    digits = digits.str.replace(fmt["thousands"], "", regex=False)
+    if fmt["decimal"] != ".":
+        digits = digits.str.replace(fmt["decimal"], ".", regex=False)
+    digits = digits.where(valid)
+
+    try:
+        numbers = digits.astype(pd.ArrowDtype(pa.float64()))
+    except (pa.ArrowInvalid, ValueError):
+        numbers = pd.to_numeric(digits, errors="coerce", dtype_backend="pyarrow")
+    numbers = numbers.where(~negative, -numbers)
+    if not arrow_input:
+        numbers = numbers.astype("float64")
+    return numbers
+
+
+def normalize_column_names(columns: pd.Index) -> pd.Index:
+    """Strip whitespace and collapse repeated spaces in column names.
+
+    ``clean_dataframe`` applies this to every upload; use it to map raw
+    column names (e.g. from a CSV header or a SQL table) to cleaned ones.
+
+    Args:
+        columns: Raw column names
+
+    Returns:
+        Cleaned column names, as strings
+    """
+    return columns.astype(str).str.strip().str.replace(r"\s+", " ", regex=True)
+
+
+def _date_parse_kwargs(date_format: Dict[str, Any]) -> Dict[str, Any]:
+    """``pd.to_datetime`` arguments for a recorded date format."""
+    if date_format.get("format"):
+        return {"format": date_format["format"]}
+    if date_format.get("dayfirst"):
+        return {"dayfirst": True}
+    return {"format": "mixed"}
+
+
+def _explicit_date_format(sample: pd.Series, **kwargs) -> Optional[str]:
+    """Guess a strftime format reproducing a heuristic parse of ``sample``.
+
+    Parsing with an explicit format is much faster than ``format="mixed"``;
+    the guess is only returned if it gives exactly the same result.
+    """
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", UserWarning)
+            guess = guess_datetime_format(sample.iloc[0], dayfirst=bool(kwargs.get("dayfirst")))
+    except (TypeError, ValueError):
+        return None
+    if guess is None:
+        return None
+    reference = pd.to_datetime(sample, errors="coerce", **kwargs)
+    try:
+        explicit = pd.to_datetime(sample, errors="coerce", format=guess)
+    except (TypeError, ValueError):
+        return None
+    return guess if explicit.equals(reference) else None
+
+
+def _success_rate(parsed: pd.Series, original: pd.Series) -> float:
+    return float(parsed.notna().sum() / max(1, original.notna().sum()))
+
+
+def _detect_dates(series: pd.Series) -> Optional[Tuple[pd.Series, Dict[str, Any]]]:
+    """Parse a text column as dates if enough of a sample looks like dates.
+
+    Args:
+        series: Text column
+
+    Returns:
+        (parsed series, date format) tuple, or None if the column isn't
+        date-like; the format records the explicit strftime format (if one
+        reproduces the parse), the dayfirst flag and the share of values parsed
+    """
+    sample = series.dropna().astype(str).head(100)  # Increased sample size
+    if sample.empty:
+        return None
+
+    # Try multiple date parsing strategies
+    best_success_rate = 0.0
+
+    # Strategy 1: ISO format (2024-01-15) - don't use dayfirst
+    parsed = pd.to_datetime(sample, errors="coerce", format="mixed")
+    best_success_rate = max(best_success_rate, parsed.notna().mean())
+
+    # Strategy 2: Day-first format (15/01/2024 or 15-01-2024)
+    if best_success_rate < 0.8:  # Only try if first strategy wasn't great
+        parsed = pd.to_datetime(sample, errors="coerce", dayfirst=True)
+        best_success_rate = max(best_success_rate, parsed.notna().mean())
+
+    # Apply if we got at least 50% success rate (lowered threshold)
+    if best_success_rate < 0.5:
+        return None
+
+    # Determine which strategy worked best and apply to full column
+    kwargs: Dict[str, Any] = {"format": "mixed"}
+    parsed_full = _parse_dates(series, **kwargs)
+    if parsed_full.notna().mean() < best_success_rate - 0.1:
+        # Try dayfirst if mixed format didn't work well
+        kwargs = {"dayfirst": True}
+        parsed_full = _parse_dates(series, **kwargs)
+
+    date_format = {
+        "format": _explicit_date_format(sample, **kwargs),
+        "dayfirst": "dayfirst" in kwargs,
+        "success": _success_rate(parsed_full, series),
+    }
+    return parsed_full, date_format
+
+
+def _parse_dates_with_hint(series: pd.Series, date_format: Dict[str, Any]) -> Optional[pd.Series]:
+    """Parse a column with a remembered date format.
+
+    A sample is parsed first so a column that no longer matches is rejected
+    before paying for a full parse. The caller must still check the full
+    result against the recorded success rate (see ``_hint_fits``).
+
+    Args:
+        series: Text column
+        date_format: Format recorded by ``_detect_dates``
+
+    Returns:
+        Parsed series, or None if the sample shows the format no longer fits
+    """
+    sample = series.dropna().astype(str).head(100)
+    if sample.empty:
+        return None
+    kwargs = _date_parse_kwargs(date_format)
+    min_rate = float(date_format.get("success", 1.0)) - 0.1
+    if _success_rate(pd.to_datetime(sample, errors="coerce", **kwargs), sample) < min_rate:
+        return None
+    return _parse_dates(series, **kwargs)
+
+
+def _hint_fits(parsed: pd.Series, series: pd.Series, date_format: Dict[str, Any]) -> bool:
+    """True if a hinted parse loses no more values than when the format was recorded."""
+    return _success_rate(parsed, series) >= float(date_format.get("success", 1.0))
+
+
+def _coerce_numbers_if_lossless(series: pd.Series, fmt: Dict[str, Optional[str]]) -> Optional[pd.Series]:
+    """Convert formatted numbers unless noticeably more values are lost than expected."""
+    numbers = _coerce_formatted_numbers(series, fmt)
+    if numbers.notna().sum() >= 0.9 * series.notna().sum():
+        return numbers
+    return None
+
+
+def _rows_equal(df: pd.DataFrame, left: np.ndarray, right: np.ndarray) -> np.ndarray:
+    """Compare rows ``left[i]`` and ``right[i]`` column by column, with missing == missing."""
+    equal = np.ones(len(left), dtype=bool)
+    for col in df.columns:
+        a = df[col].take(left).reset_index(drop=True)
+        b = df[col].take(right).reset_index(drop=True)
+        same = (a == b).fillna(False).to_numpy(dtype=bool)
+        equal &= same | (a.isna() & b.isna()).to_numpy(dtype=bool)
+    return equal
+
+
+def find_duplicate_rows(df: pd.DataFrame, subset: Optional[Sequence[str]] = None) -> np.ndarray:
+    """Flag rows that repeat an earlier row, optionally on a key subset of columns.
+
+    Each row is reduced to a 64-bit hash with vectorized per-column hashing,
+    and repeated hashes are found with a single hash-table pass, so the cost
+    is linear in the number of rows with one uint64 per row of extra memory.
+    Rows whose hash repeats are then compared with the first row carrying
+    that hash, so a hash collision can never drop a distinct row.
+
+    Args:
+        df: DataFrame to check
+        subset: Columns identifying a row; all columns if None or empty
+
+    Returns:
+        Boolean array, True for every occurrence after the first
+    """
+    keys = df[list(subset)] if subset else df
+    if keys.empty or len(keys.columns) == 0:
+        return np.zeros(len(df), dtype=bool)
+
+    hashes = pd.util.hash_pandas_object(keys, index=False).to_numpy()
+    repeated = pd.Series(hashes).duplicated(keep="first").to_numpy()
+    if not repeated.any():
+        return repeated
+
+    # Verify against the first row with the same hash; only rows whose hash
+    # occurs more than once take part, so the lookup table stays small
+    involved = np.flatnonzero(pd.Series(hashes).isin(pd.unique(hashes[repeated])).to_numpy())
+    codes, _ = pd.factorize(hashes[involved])
+    first = ~repeated[involved]
+    # Codes are numbered in order of first appearance
+    originals = involved[first][codes[~first]]
+    if _rows_equal(keys, involved[~first], originals).all():
+        return repeated
+    # A genuine 64-bit collision: fall back to an exact comparison
+    return keys.duplicated(keep="first").to_numpy()
+
+
+def drop_duplicate_rows(
+    df: pd.DataFrame,
+    subset: Optional[Sequence[str]] = None,
+) -> Tuple[pd.DataFrame, int]:
+    """Remove repeated rows, keeping the first occurrence.
+
+    Args:
+        df: DataFrame to deduplicate
+        subset: Columns identifying a row; all columns if None or empty
+
+    Returns:
+        (deduplicated DataFrame, number of rows dropped) tuple; the input is
+        returned as is when nothing is dropped
+    """
+    duplicated = find_duplicate_rows(df, subset)
+    dropped = int(duplicated.sum())
+    if not dropped:
+        return df, 0
+    return df.loc[~duplicated], dropped
+
+
+def clean_dataframe(
+    df: pd.DataFrame,
+    progress_callback: Optional[ProgressCallback] = None,
+    hints: Optional[Dict[str, Any]] = None,
+) -> pd.DataFrame:
     """Basic, opinionated cleaning for v1.
 
     - Normalizes column names (strip whitespace, collapse multiple spaces)
     - Removes completely empty columns
-    - Attempts to parse date-like columns using heuristics
+    - Attempts to parse date-like columns using heuristics; the format used
+      for each is recorded in ``attrs["date_formats"]``
+    - Converts formatted numeric text ("$1,234.50", "12%", "1.234,50") to
+      numbers; detected formats are recorded in ``attrs["number_formats"]``
+
+    Arrow-backed input stays Arrow-backed: parsed dates become Arrow
+    timestamps and Arrow calendar dates are widened to timestamps.
+
+    With ``hints`` (the ``date_formats`` and ``number_formats`` of an earlier
+    file with the same layout, see ``SchemaCache``) text columns skip
+    detection: remembered date and number columns are parsed directly with
+    their recorded formats and other text columns are left as text. A hinted
+    date column parsing fewer values than when its format was recorded, or
+    a hinted number column losing values, falls back to detection (keeping
+    whichever date parse leaves fewer gaps) and
+    ``attrs["schema_hints_valid"]`` is set to False.
 
     Args:
         df: Raw DataFrame
+        progress_callback: Optional callable receiving (columns_done, total_columns)
+            after each column is checked for dates
+        hints: Optional remembered formats for this column layout
 
     Returns:
         Cleaned DataFrame
@@ -35,50 +488,74 @@ def clean_dataframe(df: pd.DataFrame) -> pd.DataFrame:
     out = df.copy()
 
     # Normalize column names
-    out.columns = (
-        out.columns.astype(str)
-        .str.strip()
-        .str.replace(r"\s+", " ", regex=True)
-    )
+    out.columns = normalize_column_names(out.columns)
 
     # Remove empty columns
     out = out.dropna(axis=1, how="all")
 
-    # Try to parse datelike columns (improved heuristic)
-    for col in out.columns:  # Check ALL columns, not just first 20
-        if out[col].dtype == "object":
-            sample = out[col].dropna().astype(str).head(100)  # Increased sample size
-            if sample.empty:
+    date_formats: Dict[str, Dict[str, Any]] = {}
+    number_formats: Dict[str, Dict[str, Optional[str]]] = {}
+    hints_valid = None if hints is None else True
+    n_cols = len(out.columns)
+    for i, col in enumerate(out.columns):  # Check ALL columns, not just first 20
+        if progress_callback is not None:
+            progress_callback(i, n_cols)
+        if is_arrow_date_dtype(out[col].dtype):
+            out[col] = to_arrow_timestamp(out[col])
+            continue
+        if not is_text_dtype(out[col].dtype):
+            continue
+        arrow_input = is_arrow_dtype(out[col].dtype)
+
+        hinted = None
+        if hints is not None:
+            date_hint = hints.get("date_formats", {}).get(col)
+            number_hint = hints.get("number_formats", {}).get(col)
+            if date_hint is not None:
+                parsed = _parse_dates_with_hint(out[col], date_hint)
+                if parsed is not None and _hint_fits(parsed, out[col], date_hint):
+                    out[col] = to_arrow_timestamp(parsed) if arrow_input else parsed
+                    date_formats[col] = date_hint
+                    continue
+                if parsed is not None:
+                    hinted = parsed, {**date_hint, "success": _success_rate(parsed, out[col])}
+            elif number_hint is not None:
+                numbers = _coerce_numbers_if_lossless(out[col], number_hint)
+                if numbers is not None:
+                    out[col] = numbers
+                    number_formats[col] = number_hint
+                    continue
+            else:
+                # Plain text last time: nothing to detect
                 continue
+            hints_valid = False
+
+        # Try to parse datelike columns (improved heuristic)
+        detected = _detect_dates(out[col])
+        if hinted is not None and (detected is None or detected[0].notna().sum() < hinted[0].notna().sum()):
+            # The remembered format still parses more values than detection
+            detected = hinted
+        if detected is not None:
+            parsed, date_format = detected
+            out[col] = to_arrow_timestamp(parsed) if arrow_input else parsed
+            date_formats[col] = date_format
+            continue
 
-            # Try multiple date parsing strategies
-            best_parsed = None
-            best_success_rate = 0.0
-
-            # Strategy 1: ISO format (2024-01-15) - don't use dayfirst
-            parsed = pd.to_datetime(sample, errors="coerce", format="mixed")
-            success_rate = parsed.notna().mean()
-            if success_rate > best_success_rate:
-                best_parsed = parsed
-                best_success_rate = success_rate
-
-            # Strategy 2: Day-first format (15/01/2024 or 15-01-2024)
-            if best_success_rate < 0.8:  # Only try if first strategy wasn't great
-                parsed = pd.to_datetime(sample, errors="coerce", dayfirst=True)
-                success_rate = parsed.notna().mean()
-                if success_rate > best_success_rate:
-                    best_parsed = parsed
-                    best_success_rate = success_rate
-
-            # Apply if we got at least 50% success rate (lowered threshold)
-            if best_success_rate >= 0.5:
-                # Apply the best strategy to the full column
-                if best_parsed is not None:
-                    # Determine which strategy worked best and apply to full column
-                    parsed_full = pd.to_datetime(out[col], errors="coerce", format="mixed")
-                    if parsed_full.notna().mean() < best_success_rate - 0.1:
-                        # Try dayfirst if mixed format didn't work well
-                        parsed_full = pd.to_datetime(out[col], errors="coerce", dayfirst=True)
-                    out[col] = parsed_full
+        # Formatted numbers in columns that didn't turn out to be dates
+        sample = out[col].dropna().head(100)
+        if sample.empty:
+            continue
+        fmt = _detect_number_format(sample.astype(str))
+        if fmt is not None:
+            # Keep the text if conversion loses noticeably more values than the sample suggested
+            numbers = _coerce_numbers_if_lossless(out[col], fmt)
+            if numbers is not None:
+                out[col] = numbers
+                number_formats[col] = fmt
 
+    out.attrs["date_formats"] = date_formats
+    out.attrs["number_formats"] = number_formats
+    out.attrs["schema_hints_valid"] = hints_valid
+    if progress_callback is not None:
+        progress_callback(n_cols, n_cols)
     return out
@@ -0,0 +1,62 @@
+"""Dtype helpers shared by the NumPy and Arrow-backed pipelines."""
+import pandas as pd
+
+
+def is_arrow_dtype(dtype) -> bool:
+    """Return True for pyarrow-backed extension dtypes."""
+    return isinstance(dtype, pd.ArrowDtype)
+
+
+def is_text_dtype(dtype) -> bool:
+    """Return True for object, pandas string, Arrow string and text categorical dtypes."""
+    if isinstance(dtype, pd.CategoricalDtype):
+        return is_text_dtype(dtype.categories.dtype)
+    if is_arrow_dtype(dtype):
+        import pyarrow as pa
+
+        pa_type = dtype.pyarrow_dtype
+        return pa.types.is_string(pa_type) or pa.types.is_large_string(pa_type)
+    return pd.api.types.is_object_dtype(dtype) or isinstance(dtype, pd.StringDtype)
+
+
+def is_arrow_date_dtype(dtype) -> bool:
+    """Return True for Arrow calendar-date (date32/date64) dtypes."""
+    if not is_arrow_dtype(dtype):
+        return False
+    import pyarrow as pa
+
+    return pa.types.is_date(dtype.pyarrow_dtype)
+
+
+def is_datetime_dtype(dtype) -> bool:
+    """Return True for NumPy, tz-aware and Arrow timestamp dtypes."""
+    return pd.api.types.is_datetime64_any_dtype(dtype)
+
+
+def to_arrow_timestamp(series: pd.Series) -> pd.Series:
+    """Convert a datetime or Arrow date series to an Arrow ``timestamp[ns]`` series."""
+    import pyarrow as pa
+
+    tz = None
+    if is_datetime_dtype(series.dtype) and not is_arrow_date_dtype(series.dtype):
+        tz = series.dt.tz
+    return series.astype(pd.ArrowDtype(pa.timestamp("ns", tz=str(tz) if tz else None)))
+
+
+def to_datetime64(series: pd.Series) -> pd.Series:
+    """Return ``series`` with a NumPy datetime64 dtype, as resampling requires.
+
+    Arrow timestamps are converted without going through Python objects;
+    NumPy-backed series are returned unchanged.
+    """
+    if not is_arrow_dtype(series.dtype):
+        return series
+    tz = None if is_arrow_date_dtype(series.dtype) else series.dt.tz
+    return series.astype(pd.DatetimeTZDtype("ns", tz) if tz is not None else "datetime64[ns]")
+
+
+def to_float_array(series: pd.Series):
+    """Return the values of a numeric series as a float64 NumPy array."""
+    import numpy as np
+
+    return series.to_numpy(dtype="float64", na_value=np.nan)
@@ -0,0 +1,120 @@
+"""Lookup-table enrichment: join dimension attributes onto a fact table."""
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+from pandas.api.extensions import take
+
+from .dtypes import is_text_dtype
+
+
+def _normalize_keys(values: pd.Series) -> pd.Index:
+    """Canonical key strings, so 42, 42.0 and "42" match each other.
+
+    Only ever applied to distinct values, never to every fact row.
+    """
+    values = pd.Series(values).reset_index(drop=True)
+    if pd.api.types.is_numeric_dtype(values.dtype) and not pd.api.types.is_bool_dtype(values.dtype):
+        numbers = values.astype("float64")
+        if (numbers.dropna() % 1 == 0).all():
+            values = numbers.astype("Int64")
+    keys = values.astype(str).str.strip()
+    return pd.Index(keys.where(values.notna()), dtype=object)
+
+
+class LookupIndex:
+    """Hash index over a dimension table, built once and reused for joins.
+
+    The key column is normalized and indexed with a ``pd.Index`` hash
+    table; text attributes are stored as categorical codes. A join
+    factorizes the fact column, looks up each *distinct* key once, and
+    broadcasts the attribute codes to the fact rows with a single integer
+    ``take`` per attribute, so enriched text columns are categoricals that
+    cost one small integer per row instead of a string object.
+
+    Rows of the dimension table repeating an earlier key are ignored.
+
+    Args:
+        table: Dimension table (e.g. one row per store or SKU)
+        key: Column of ``table`` holding the join key
+    """
+
+    def __init__(self, table: pd.DataFrame, key: str):
+        if key not in table.columns:
+            raise KeyError(f"Lookup table has no column {key!r}")
+        keys = _normalize_keys(table[key])
+        repeated = keys.duplicated() & ~keys.isna()
+        unique = ~(repeated | keys.isna())
+        self.key = key
+        self.duplicate_keys = int(repeated.sum())
+        self.index = pd.Index(keys[unique])
+        rows = table.loc[unique]
+        self.attributes: Dict[str, Any] = {}
+        for col in table.columns:
+            if col == key:
+                continue
+            if is_text_dtype(rows[col].dtype):
+                self.attributes[col] = pd.Categorical(rows[col].astype(object))
+            elif pd.api.types.is_extension_array_dtype(rows[col].dtype):
+                self.attributes[col] = rows[col].array
+            else:
+                self.attributes[col] = rows[col].to_numpy()
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def join(self, df: pd.DataFrame, on: str) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+        """Add the lookup attributes to ``df``, matched on column ``on``.
+
+        Attribute names already used in ``df`` get a " (lookup)" suffix.
+
+        Args:
+            df: Fact table
+            on: Column of ``df`` holding the keys
+
+        Returns:
+            (enriched DataFrame, stats) tuple; stats holds "columns" (the
+            added names), "matched_rows", "rows" and "unmatched_keys" (a few
+            distinct keys without a match, with "unmatched_count" in total)
+        """
+        codes, uniques = pd.factorize(df[on])
+        # Dimension row per distinct fact key, -1 where unmatched
+        positions = self.index.get_indexer(_normalize_keys(pd.Series(uniques)))
+        matched = positions >= 0
+
+        added: Dict[str, Any] = {}
+        for col, values in self.attributes.items():
+            name = col if col not in df.columns else f"{col} (lookup)"
+            if isinstance(values, pd.Categorical):
+                per_key = take(values.codes, positions, allow_fill=True, fill_value=-1)
+                used = np.unique(per_key[per_key >= 0])
+                # Renumber so only categories present in this fact table remain;
+                # the extra last entry keeps -1 (no match) at -1
+                remap = np.full(len(values.categories) + 1, -1, dtype=per_key.dtype)
+                remap[used] = np.arange(len(used), dtype=per_key.dtype)
+                # A trailing -1 sends missing fact keys (code -1) to "no match"
+                per_key = np.append(remap[per_key], per_key.dtype.type(-1))
+                added[name] = pd.Categorical.from_codes(per_key[codes], values.categories[used])
+            else:
+                per_key = take(values, positions, allow_fill=True)
+                added[name] = take(per_key, codes, allow_fill=True)
+
+        out = df.assign(**added)
+        unmatched = uniques[~matched]
+        stats = {
+            "columns": list(added),
+            "rows": len(df),
+            "matched_rows": int(np.append(matched, False)[codes].sum()),
+            "unmatched_count": len(unmatched),
+            "unmatched_keys": [str(k) for k in unmatched[:5]],
+        }
+        return out, stats
+
+
+def lookup_key_candidates(table: pd.DataFrame) -> List[str]:
+    """Columns of a dimension table that could serve as its key (unique, no gaps first)."""
+    def score(col: str) -> Tuple[bool, int]:
+        values = table[col]
+        return values.notna().all() and values.is_unique, -list(table.columns).index(col)
+
+    return sorted(table.columns, key=score, reverse=True)
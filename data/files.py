@@ -0,0 +1,28 @@
+"""File helpers shared by the on-disk caches and the watch-folder mode."""
+import os
+import uuid
+from typing import BinaryIO, Callable
+
+
+def atomic_write(path: str, write: Callable[[BinaryIO], None]) -> None:
+    """Write a file so readers see either the old or the complete new content.
+
+    ``write`` fills a temporary file next to ``path``, which then replaces
+    it. The temporary file is created with ``open()``, so the result gets
+    the usual umask-derived permissions. On failure it is removed and the
+    error re-raised.
+
+    Args:
+        path: Destination file
+        write: Callable writing the content to a binary file object
+    """
+    directory, name = os.path.split(path)
+    tmp_path = os.path.join(directory, f".{name}.{uuid.uuid4().hex}.tmp")
+    try:
+        with open(tmp_path, "xb") as fh:
+            write(fh)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
@@ -1,9 +1,10 @@
 """Column inference utilities."""
-from typing import Optional, Tuple
+from typing import Dict, Optional, Tuple
 
-import numpy as np
 import pandas as pd
 
+from .dtypes import is_datetime_dtype, is_text_dtype
+
 
 def infer_date_column(df: pd.DataFrame) -> Optional[str]:
     """Infer the most suitable date column from a DataFrame.
@@ -16,7 +17,7 @@ def infer_date_column(df: pd.DataFrame) -> Optional[str]:
     Returns:
         Name of the inferred date column, or None if no datetime columns exist
     """
-    date_cols = [c for c in df.columns if np.issubdtype(df[c].dtype, np.datetime64)]
+    date_cols = [c for c in df.columns if is_datetime_dtype(df[c].dtype)]
     if not date_cols:
         return None
     date_cols = sorted(date_cols, key=lambda c: df[c].notna().sum(), reverse=True)
@@ -47,7 +48,8 @@ def infer_metric_column(df: pd.DataFrame) -> Optional[str]:
         if "id" in name or "postcode" in name or "zip" in name:
             penalty -= 2
         non_null = int(df[col].notna().sum())
-        var = float(df[col].var(skipna=True) or 0.0)
+        var = df[col].var(skipna=True)
+        var = float(var) if pd.notna(var) else 0.0
         return (penalty + non_null, var)
 
     num_cols = sorted(num_cols, key=score, reverse=True)
@@ -68,7 +70,7 @@ def infer_category_column(df: pd.DataFrame) -> Optional[str]:
     Returns:
         Name of the inferred category column, or None if no object columns exist
     """
-    obj_cols = [c for c in df.columns if df[c].dtype == "object"]
+    obj_cols = [c for c in df.columns if is_text_dtype(df[c].dtype)]
     if not obj_cols:
         return None
 
@@ -82,3 +84,77 @@ def infer_category_column(df: pd.DataFrame) -> Optional[str]:
 
     obj_cols = sorted(obj_cols, key=score, reverse=True)
     return obj_cols[0]
+
+
+def _role_fits(df: pd.DataFrame, col: Optional[str], fits) -> bool:
+    return col is None or (col in df.columns and fits(df[col]))
+
+
+def infer_column_roles(
+    df: pd.DataFrame,
+    remembered: Optional[Dict[str, Optional[str]]] = None,
+) -> Tuple[Dict[str, Optional[str]], bool]:
+    """Infer the date, metric and category columns, reusing a remembered choice.
+
+    A choice remembered for the same column layout (see ``SchemaCache``) is
+    reused without re-scoring every column, as long as each remembered
+    column still exists with a suitable dtype.
+
+    Args:
+        df: Cleaned DataFrame
+        remembered: Optional dict with "date_col", "metric_col" and
+            "category_col" keys from an earlier file with the same layout
+
+    Returns:
+        (roles, reused) tuple; ``reused`` is False if the roles were inferred
+    """
+    if remembered is not None and all(
+        _role_fits(df, remembered.get(role), fits)
+        for role, fits in (
+            ("date_col", lambda s: is_datetime_dtype(s.dtype)),
+            ("metric_col", pd.api.types.is_numeric_dtype),
+            ("category_col", lambda s: is_text_dtype(s.dtype)),
+        )
+    ):
+        roles = {role: remembered.get(role) for role in ("date_col", "metric_col", "category_col")}
+        return roles, True
+
+    roles = {
+        "date_col": infer_date_column(df),
+        "metric_col": infer_metric_column(df),
+        "category_col": infer_category_column(df),
+    }
+    return roles, False
+
+
+def column_kind(dtype) -> str:
+    """Classify a dtype as "date", "number", "text" or "other"."""
+    if is_datetime_dtype(dtype):
+        return "date"
+    if pd.api.types.is_bool_dtype(dtype):
+        return "other"
+    if pd.api.types.is_numeric_dtype(dtype):
+        return "number"
+    if is_text_dtype(dtype):
+        return "text"
+    return "other"
+
+
+def profile_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """Summarize each column's kind and completeness.
+
+    Cheap enough to run on every dataset: no distinct counts are computed.
+
+    Args:
+        df: Cleaned DataFrame
+
+    Returns:
+        DataFrame with "Column", "Kind", "Non-null" and "Missing %" columns
+    """
+    non_null = df.notna().sum()
+    return pd.DataFrame({
+        "Column": list(df.columns),
+        "Kind": [column_kind(dtype) for dtype in df.dtypes],
+        "Non-null": non_null.to_numpy(),
+        "Missing %": (100.0 * (1 - non_null / max(1, len(df)))).round(1).to_numpy(),
+    })
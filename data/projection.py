@@ -0,0 +1,77 @@
+"""Projected loading: parse only the columns the dashboard uses."""
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+from .cleaning import ProgressCallback, clean_dataframe, normalize_column_names, read_csv
+from .dtypes import is_text_dtype
+
+
+def _projection_dtypes(sample_raw: pd.DataFrame, raw_names: List[str], use_arrow: bool) -> Dict[str, Any]:
+    """Explicit read dtypes for the projected columns, taken from the sample.
+
+    Text columns are read as strings (dates and formatted numbers are parsed
+    afterwards with the formats found in the sample) and float columns as
+    float64. Integer columns are left to the parser, since a missing value
+    past the sample would not fit a NumPy integer dtype.
+    """
+    dtypes: Dict[str, Any] = {}
+    for name in raw_names:
+        dtype = sample_raw[name].dtype
+        if is_text_dtype(dtype):
+            if use_arrow:
+                import pyarrow as pa
+
+                dtypes[name] = pd.ArrowDtype(pa.string())
+            else:
+                dtypes[name] = str
+        elif pd.api.types.is_float_dtype(dtype):
+            dtypes[name] = dtype
+    return dtypes
+
+
+def read_csv_projected(
+    file,
+    sample_raw: pd.DataFrame,
+    sample: pd.DataFrame,
+    columns: List[str],
+    progress_callback: Optional[ProgressCallback] = None,
+    use_arrow: bool = False,
+) -> pd.DataFrame:
+    """Read and clean only ``columns`` of a CSV, using what a row sample revealed.
+
+    The second phase of projected loading: after cleaning and inference ran
+    on a bounded row sample (``read_csv(..., nrows=...)``), the file is read
+    again with ``usecols`` and explicit dtypes so the other columns are never
+    converted, and the date and number formats found in the sample are
+    passed to ``clean_dataframe`` as hints. Columns whose formats don't hold
+    beyond the sample fall back to full detection.
+
+    Args:
+        file: Uploaded file object, positioned at the start
+        sample_raw: Raw row sample as returned by ``read_csv``
+        sample: ``clean_dataframe`` output for the sample
+        columns: Cleaned names of the columns to load
+        progress_callback: Optional callable receiving (bytes_read, total_bytes)
+        use_arrow: Parse with the pyarrow engine into pyarrow-backed dtypes
+
+    Returns:
+        Cleaned DataFrame holding only ``columns``
+    """
+    # usecols takes the names as they appear in the file
+    raw_by_clean = dict(zip(normalize_column_names(sample_raw.columns), sample_raw.columns))
+    raw_names = [raw_by_clean[c] for c in columns if c in raw_by_clean]
+
+    dtypes = _projection_dtypes(sample_raw, raw_names, use_arrow)
+    try:
+        df_raw = read_csv(file, progress_callback, use_arrow=use_arrow, usecols=raw_names, dtype=dtypes)
+    except (TypeError, ValueError):
+        # A float column holds text past the sample; let the parser infer it
+        file.seek(0)
+        df_raw = read_csv(file, progress_callback, use_arrow=use_arrow, usecols=raw_names)
+
+    hints = {
+        "date_formats": {c: f for c, f in sample.attrs.get("date_formats", {}).items() if c in columns},
+        "number_formats": {c: f for c, f in sample.attrs.get("number_formats", {}).items() if c in columns},
+    }
+    return clean_dataframe(df_raw, hints=hints)
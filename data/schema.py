@@ -0,0 +1,113 @@
+"""Persistent cache of column layouts seen in earlier uploads."""
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Dict, Optional
+
+import pandas as pd
+
+from .cleaning import normalize_column_names
+from .files import atomic_write
+
+# Bump when the remembered schema format changes so stale entries are ignored
+SCHEMA_VERSION = 1
+
+_SUFFIX = ".schema.json"
+
+
+def schema_fingerprint(df: pd.DataFrame) -> str:
+    """Fingerprint the layout of a raw frame: normalized column names and dtypes.
+
+    Files exported from the same source each week share a fingerprint even
+    though their contents differ.
+
+    Args:
+        df: Raw DataFrame as returned by ``read_csv``
+
+    Returns:
+        Hex digest identifying the layout
+    """
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"v{SCHEMA_VERSION}".encode())
+    for name, dtype in zip(normalize_column_names(df.columns), df.dtypes):
+        h.update(b"\0" + name.encode("utf-8") + b"\0" + str(dtype).encode("utf-8"))
+    return h.hexdigest()
+
+
+class SchemaCache:
+    """Remembered cleaning formats and column roles, keyed by layout fingerprint.
+
+    Each entry is a small JSON file holding the ``date_formats`` and
+    ``number_formats`` recorded by ``clean_dataframe`` and the chosen
+    date/metric/category columns. A later upload with the same fingerprint
+    passes the entry to ``clean_dataframe`` as hints and to
+    ``infer_column_roles``; when either rejects it, the caller stores the
+    freshly detected schema in its place. The least recently used entries
+    beyond ``max_entries`` are removed.
+
+    Args:
+        directory: Cache directory, created if missing
+        max_entries: Maximum number of remembered layouts
+    """
+
+    def __init__(self, directory: str, max_entries: int = 256):
+        self.directory = directory
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, fingerprint: str) -> str:
+        return os.path.join(self.directory, fingerprint + _SUFFIX)
+
+    def get(self, fingerprint: str) -> Optional[Dict[str, Any]]:
+        """Return the remembered schema for a layout, or None on a miss.
+
+        Args:
+            fingerprint: Layout fingerprint from ``schema_fingerprint``
+
+        Returns:
+            Dict with "date_formats", "number_formats" and "roles" keys, or None
+        """
+        path = self._path(fingerprint)
+        try:
+            with open(path, "r", encoding="utf-8") as fh:
+                schema = json.load(fh)
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        return schema if isinstance(schema, dict) else None
+
+    def put(self, fingerprint: str, schema: Dict[str, Any]) -> None:
+        """Remember the schema detected for a layout, replacing any previous one.
+
+        Args:
+            fingerprint: Layout fingerprint from ``schema_fingerprint``
+            schema: JSON-serializable dict with "date_formats", "number_formats"
+                and "roles" keys
+        """
+        with self._lock:
+            try:
+                atomic_write(
+                    self._path(fingerprint),
+                    lambda fh: fh.write(json.dumps(schema, default=str).encode("utf-8")),
+                )
+            except OSError:
+                return
+            self._evict()
+
+    def _evict(self) -> None:
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(_SUFFIX):
+                continue
+            try:
+                entries.append((os.stat(os.path.join(self.directory, name)).st_mtime, name))
+            except OSError:
+                continue
+        entries.sort()
+        for _, name in entries[: max(0, len(entries) - self.max_entries)]:
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                pass
@@ -0,0 +1,287 @@
+"""SQLite data source with aggregation pushed down into SQL."""
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+from urllib.parse import quote
+
+import pandas as pd
+
+from .cleaning import normalize_column_names
+
+# Offset between the Julian day number and the Unix epoch
+_UNIX_EPOCH_JULIAN_DAY = 2440587.5
+
+# SQL expressions mapping a Julian day to the label of its resample bucket:
+# "MS" buckets are labelled with the first of the month, "W-MON" buckets with
+# the Monday on or after the date (pandas closes and labels them on the right)
+_BUCKET_EXPRESSIONS = {
+    "MS": "date({jd}, 'start of month')",
+    "W-MON": "date({jd}, 'weekday 1')",
+}
+
+
+def quote_identifier(name: str) -> str:
+    """Quote a table or column name for use in SQLite SQL."""
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def sql_column_names(sample: pd.DataFrame) -> Dict[str, str]:
+    """Map the cleaned column names of a fetched sample back to SQL column names."""
+    return dict(zip(normalize_column_names(sample.columns), sample.columns))
+
+
+def resolve_database_path(root: str, path: str) -> str:
+    """Resolve a user-supplied database path, refusing anything outside ``root``.
+
+    Relative paths are taken relative to ``root``. Symlinks and ".." are
+    resolved before the check, so neither can be used to escape it.
+
+    Args:
+        root: Directory holding the databases that may be opened
+        path: Path entered by the user
+
+    Returns:
+        Absolute, resolved path of the database file
+
+    Raises:
+        ValueError: If the path lies outside ``root``
+    """
+    root = os.path.realpath(root)
+    resolved = os.path.realpath(os.path.join(root, os.path.expanduser(path)))
+    if os.path.commonpath([root, resolved]) != root or resolved == root:
+        raise ValueError(f"Only databases inside {root} can be opened")
+    return resolved
+
+
+def _julian_to_timestamp(value: Optional[float]) -> Optional[pd.Timestamp]:
+    if value is None:
+        return None
+    return pd.Timestamp((value - _UNIX_EPOCH_JULIAN_DAY) * 86400.0, unit="s").round("ms")
+
+
+class SQLiteConnectionPool:
+    """Bounded pool of read-only connections to one SQLite file.
+
+    The file is opened with ``mode=ro`` and ``PRAGMA query_only``, so neither
+    a table nor a user query can modify it. Connections are created lazily,
+    reused across threads, and at most ``size`` are in use at once; further
+    callers wait for one to be returned.
+
+    Args:
+        path: Path to the SQLite database file
+        size: Maximum number of open connections
+    """
+
+    def __init__(self, path: str, size: int = 4):
+        if not os.path.isfile(path):
+            raise FileNotFoundError(f"SQLite database not found: {path}")
+        self.path = path
+        self._uri = f"file:{quote(os.path.abspath(path))}?mode=ro"
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self._uri, uri=True, check_same_thread=False)
+        conn.execute("PRAGMA query_only = ON")
+        return conn
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """Borrow a connection for the duration of a ``with`` block."""
+        self._slots.acquire()
+        try:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                conn = self._connect()
+            try:
+                yield conn
+            finally:
+                self._idle.put(conn)
+        finally:
+            self._slots.release()
+
+    def close(self) -> None:
+        """Close every idle connection."""
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+class SQLiteSource:
+    """Tables or queries of a SQLite file, aggregated inside SQLite.
+
+    Only aggregated results (KPI totals, per-bucket sums, top-N categories)
+    are transferred into pandas; row-level data is fetched solely for the
+    bounded preview sample used for column detection.
+
+    A relation is either a table name or a single SELECT statement, which is
+    wrapped as a subquery. Date columns are evaluated with SQLite's
+    ``julianday()``, which understands ISO-8601 text; values it cannot parse
+    are treated as missing, like ``errors="coerce"`` in pandas.
+
+    Args:
+        path: Path to the SQLite database file
+        pool_size: Maximum number of concurrent read-only connections
+    """
+
+    def __init__(self, path: str, pool_size: int = 4):
+        self.pool = SQLiteConnectionPool(path, pool_size)
+
+    def _query(self, sql: str, params: Sequence[Any] = ()) -> List[tuple]:
+        with self.pool.connection() as conn:
+            return conn.execute(sql, params).fetchall()
+
+    def tables(self) -> List[str]:
+        """Names of the tables and views in the database."""
+        rows = self._query(
+            "SELECT name FROM sqlite_master WHERE type IN ('table', 'view') "
+            "AND name NOT LIKE 'sqlite_%' ORDER BY name"
+        )
+        return [name for (name,) in rows]
+
+    def relation(self, table: Optional[str] = None, query: Optional[str] = None) -> str:
+        """Build the FROM-clause source for a table or a user query.
+
+        Args:
+            table: Table or view name
+            query: SELECT statement, used when no table is given
+
+        Returns:
+            SQL fragment usable after ``FROM``
+        """
+        if table:
+            if table not in self.tables():
+                raise ValueError(f"Unknown table {table!r}")
+            return quote_identifier(table)
+        sql = (query or "").strip().rstrip(";").strip()
+        if not sql:
+            raise ValueError("Choose a table or enter a query")
+        if ";" in sql:
+            raise ValueError("Only a single SELECT statement is supported")
+        # Validate (and fail early on syntax errors) without reading rows
+        self._query(f"SELECT * FROM ({sql}) LIMIT 0")
+        return f"({sql}) AS src"
+
+    def fetch_sample(self, relation: str, limit: int) -> pd.DataFrame:
+        """Fetch the first ``limit`` rows of a relation."""
+        with self.pool.connection() as conn:
+            return pd.read_sql_query(f"SELECT * FROM {relation} LIMIT ?", conn, params=(int(limit),))
+
+    def date_parse_rate(self, relation: str, date_col: str) -> float:
+        """Share of non-null values in ``date_col`` that SQLite can parse as dates."""
+        col = quote_identifier(date_col)
+        ((present, parsed),) = self._query(f"SELECT COUNT({col}), COUNT(julianday({col})) FROM {relation}")
+        return parsed / present if present else 0.0
+
+    def summary(self, relation: str, date_col: Optional[str], metric_col: Optional[str]) -> Dict[str, Any]:
+        """Row count, date range and metric totals in one scan.
+
+        Args:
+            relation: Output of ``relation``
+            date_col: Date column, or None
+            metric_col: Numeric metric column, or None
+
+        Returns:
+            Dict with "rows", "date_min", "date_max", "total", "mean" and, when
+            both columns are given, "paired_rows", "paired_min" and "paired_max"
+            over the rows where both the date and the metric are present
+        """
+        jd = f"julianday({quote_identifier(date_col)})" if date_col else "NULL"
+        metric = quote_identifier(metric_col) if metric_col else "NULL"
+        paired = f"CASE WHEN {metric} IS NOT NULL THEN {jd} END"
+        ((rows, dmin, dmax, total, mean, n_paired, pmin, pmax),) = self._query(
+            f"SELECT COUNT(*), MIN({jd}), MAX({jd}), TOTAL({metric}), AVG({metric}), "
+            f"COUNT({paired}), MIN({paired}), MAX({paired}) FROM {relation}"
+        )
+        return {
+            "rows": rows,
+            "date_min": _julian_to_timestamp(dmin),
+            "date_max": _julian_to_timestamp(dmax),
+            "total": total if metric_col else None,
+            "mean": mean if metric_col else None,
+            "paired_rows": n_paired,
+            "paired_min": _julian_to_timestamp(pmin),
+            "paired_max": _julian_to_timestamp(pmax),
+        }
+
+    def bucket_sums(self, relation: str, date_col: str, metric_col: str, freq: str) -> pd.Series:
+        """Sum of a metric per time bucket, matching ``resample(freq).sum()``.
+
+        Empty buckets between the first and last one are filled with 0.
+
+        Args:
+            relation: Output of ``relation``
+            date_col: Date column
+            metric_col: Numeric metric column
+            freq: "MS" (month start) or "W-MON" (weeks ending Monday)
+
+        Returns:
+            Float series indexed by bucket label
+        """
+        if freq not in _BUCKET_EXPRESSIONS:
+            raise ValueError(f"Unsupported bucket frequency {freq!r}; expected one of {list(_BUCKET_EXPRESSIONS)}")
+        jd = f"julianday({quote_identifier(date_col)})"
+        metric = quote_identifier(metric_col)
+        bucket = _BUCKET_EXPRESSIONS[freq].format(jd=jd)
+        rows = self._query(
+            f"SELECT {bucket} AS bucket, TOTAL({metric}) FROM {relation} "
+            f"WHERE {jd} IS NOT NULL AND {metric} IS NOT NULL GROUP BY bucket ORDER BY bucket"
+        )
+        if not rows:
+            return pd.Series(dtype="float64", name=metric_col)
+        sums = pd.Series(
+            [total for _, total in rows],
+            index=pd.DatetimeIndex([bucket for bucket, _ in rows]),
+            dtype="float64",
+            name=metric_col,
+        )
+        full_range = pd.date_range(sums.index[0], sums.index[-1], freq=freq)
+        return sums.reindex(full_range, fill_value=0.0)
+
+    def top_categories(
+        self,
+        relation: str,
+        category_col: str,
+        metric_col: Optional[str],
+        top_n: int,
+    ) -> pd.Series:
+        """Top categories by metric sum (or by row count without a metric).
+
+        Ordered like the pandas path of ``build_category_chart``: descending
+        by sum, or ascending by count.
+
+        Args:
+            relation: Output of ``relation``
+            category_col: Category column
+            metric_col: Numeric metric column, or None to count rows
+            top_n: Number of categories to return
+
+        Returns:
+            Series of sums or counts indexed by category
+        """
+        cat = quote_identifier(category_col)
+        if metric_col:
+            metric = quote_identifier(metric_col)
+            value = f"TOTAL({metric})"
+            where = f"{cat} IS NOT NULL AND {metric} IS NOT NULL"
+        else:
+            value = "COUNT(*)"
+            where = f"{cat} IS NOT NULL"
+        rows = self._query(
+            f"SELECT {cat}, {value} AS value FROM {relation} WHERE {where} "
+            f"GROUP BY {cat} ORDER BY value DESC LIMIT ?",
+            (int(top_n),),
+        )
+        agg = pd.Series(
+            [v for _, v in rows],
+            index=pd.Index([c for c, _ in rows], name=category_col),
+            dtype="float64" if metric_col else "int64",
+            name=metric_col or "count",
+        )
+        return agg if metric_col else agg.sort_values(ascending=True)
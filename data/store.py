@@ -0,0 +1,257 @@
+"""Process-wide in-memory store of cleaned datasets shared across sessions."""
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+import pandas as pd
+
+Loader = Callable[[], Tuple[pd.DataFrame, Dict[str, Any]]]
+
+
+def frame_nbytes(df: pd.DataFrame) -> int:
+    """Approximate in-memory size of a DataFrame, including object payloads."""
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+@dataclass
+class _Entry:
+    df: pd.DataFrame
+    meta: Dict[str, Any]
+    nbytes: int
+    sessions: Set[str] = field(default_factory=set)
+    # Bytes of data each session derived from this dataset and still holds
+    derived: Dict[str, int] = field(default_factory=dict)
+
+    def cost(self, session_id: Optional[str] = None) -> int:
+        """Bytes charged for this dataset, to one session or in total."""
+        if session_id is None:
+            return self.nbytes + sum(self.derived.values())
+        return self.nbytes + self.derived.get(session_id, 0)
+
+
+class DatasetStore:
+    """Deduplicating, memory-bounded store of cleaned datasets.
+
+    Identical uploads (same content key) are loaded once and shared by every
+    session that asks for them. Callers receive shallow copies, so with
+    pandas copy-on-write enabled a session can never modify the shared frame.
+
+    Two budgets are enforced, both least-recently-used first:
+
+    - ``session_max_bytes`` caps the datasets one session keeps referenced;
+      older datasets are released from that session.
+    - ``max_bytes`` caps the whole store; the least recently used datasets
+      are dropped even if sessions still reference them.
+
+    Data a session derives from a dataset (joined or deduplicated copies,
+    charts, reports) is charged to it with ``charge`` and counts against
+    both budgets. When a budget drops a session's reference to a dataset,
+    the callback registered with ``on_release`` is told, so the session can
+    free what it derived too.
+
+    Evicted datasets are simply recomputed by the caller's loader on the next
+    request, so eviction trades CPU for memory and never loses data.
+
+    Args:
+        max_bytes: Global memory budget for all stored datasets
+        session_max_bytes: Memory budget per session
+    """
+
+    def __init__(self, max_bytes: int, session_max_bytes: int):
+        self.max_bytes = max_bytes
+        self.session_max_bytes = session_max_bytes
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._sessions: Dict[str, "OrderedDict[str, None]"] = {}
+        self._lock = threading.Lock()
+        # Per-key load lock and the number of callers holding or awaiting it
+        self._key_locks: Dict[str, Tuple[threading.Lock, int]] = {}
+        # Loaded datasets over budget, shared only with callers already waiting
+        self._unretained: Dict[str, _Entry] = {}
+        self._listeners: Dict[str, Callable[[str], None]] = {}
+        # (session, key) references dropped by a budget, notified outside the lock
+        self._dropped: List[Tuple[str, str]] = []
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str, session_id: str, loader: Loader) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+        """Return the dataset for ``key``, loading it at most once per residency.
+
+        Concurrent requests for the same key wait for a single load, also
+        for datasets too large to be retained: those are shared with every
+        caller that was waiting when the load finished.
+
+        Args:
+            key: Content key of the upload (see ``content_hash``)
+            session_id: Identifier of the requesting session
+            loader: Callable producing (DataFrame, metadata) on a miss
+
+        Returns:
+            (DataFrame view, metadata copy) tuple
+        """
+        entry = self._lookup(key, session_id)
+        if entry is None:
+            with self._lock:
+                # Reference-counted so the lock outlives every waiter: a caller
+                # arriving after the first load still queues behind the others
+                key_lock, waiters = self._key_locks.get(key, (threading.Lock(), 0))
+                self._key_locks[key] = (key_lock, waiters + 1)
+            try:
+                with key_lock:
+                    # Another session may have loaded it while we waited; a
+                    # dataset over budget is only handed to current waiters
+                    entry = self._lookup(key, session_id)
+                    with self._lock:
+                        entry = entry or self._unretained.get(key)
+                    if entry is None:
+                        with self._lock:
+                            self.misses += 1
+                        df, meta = loader()
+                        entry = self._insert(key, session_id, df, meta)
+                        with self._lock:
+                            if key not in self._entries:
+                                self._unretained[key] = entry
+            finally:
+                with self._lock:
+                    key_lock, waiters = self._key_locks[key]
+                    if waiters == 1:
+                        del self._key_locks[key]
+                        self._unretained.pop(key, None)
+                    else:
+                        self._key_locks[key] = (key_lock, waiters - 1)
+        self._notify()
+        return entry.df.copy(deep=False), dict(entry.meta)
+
+    def peek(self, key: str, session_id: str) -> Optional[Tuple[pd.DataFrame, Dict[str, Any]]]:
+        """Return the dataset for ``key`` if it is already stored, without loading.
+
+        Args:
+            key: Content key of the upload
+            session_id: Identifier of the requesting session
+
+        Returns:
+            (DataFrame view, metadata copy) tuple, or None if not stored
+        """
+        entry = self._lookup(key, session_id)
+        self._notify()
+        if entry is None:
+            return None
+        return entry.df.copy(deep=False), dict(entry.meta)
+
+    def charge(self, key: str, session_id: str, nbytes: int) -> None:
+        """Count data a session derived from dataset ``key`` against the budgets.
+
+        Replaces the session's previous charge for ``key``. Datasets that are
+        not stored (evicted, or too large to retain) can't be charged.
+
+        Args:
+            key: Content key of the dataset the data was derived from
+            session_id: Identifier of the session holding the data
+            nbytes: Approximate size of the derived data
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and session_id in entry.sessions:
+                entry.derived[session_id] = nbytes
+                self._enforce_session_budget(session_id)
+                self._enforce_global_budget()
+        self._notify()
+
+    def on_release(self, session_id: str, callback: Callable[[str], None]) -> None:
+        """Register ``callback(key)``, called when a budget drops the session's reference to ``key``.
+
+        The callback runs on the thread that triggered the eviction, outside
+        the store's lock; it is unregistered by ``release_session``.
+        """
+        with self._lock:
+            self._listeners[session_id] = callback
+
+    def _notify(self) -> None:
+        with self._lock:
+            dropped, self._dropped = self._dropped, []
+            callbacks = [(self._listeners.get(session_id), key) for session_id, key in dropped]
+        for callback, key in callbacks:
+            if callback is not None:
+                callback(key)
+
+    def _lookup(self, key: str, session_id: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self.hits += 1
+            self._entries.move_to_end(key)
+            self._reference(key, session_id, entry)
+            return entry
+
+    def _insert(self, key: str, session_id: str, df: pd.DataFrame, meta: Dict[str, Any]) -> _Entry:
+        entry = _Entry(df=df, meta=meta, nbytes=frame_nbytes(df))
+        # Datasets over either budget are handed out but never retained
+        if entry.nbytes > self.max_bytes or entry.nbytes > self.session_max_bytes:
+            return entry
+        with self._lock:
+            self._entries[key] = entry
+            self._reference(key, session_id, entry)
+            self._enforce_global_budget()
+        return entry
+
+    def _reference(self, key: str, session_id: str, entry: _Entry) -> None:
+        refs = self._sessions.setdefault(session_id, OrderedDict())
+        refs[key] = None
+        refs.move_to_end(key)
+        entry.sessions.add(session_id)
+        self._enforce_session_budget(session_id)
+
+    def _enforce_session_budget(self, session_id: str) -> None:
+        refs = self._sessions[session_id]
+        total = sum(self._entries[k].cost(session_id) for k in refs if k in self._entries)
+        while total > self.session_max_bytes and len(refs) > 1:
+            old_key, _ = refs.popitem(last=False)
+            old = self._entries.get(old_key)
+            if old is None:
+                continue
+            total -= old.cost(session_id)
+            self._dropped.append((session_id, old_key))
+            old.sessions.discard(session_id)
+            old.derived.pop(session_id, None)
+            if not old.sessions:
+                del self._entries[old_key]
+
+    def _enforce_global_budget(self) -> None:
+        total = sum(e.cost() for e in self._entries.values())
+        while total > self.max_bytes and len(self._entries) > 1:
+            old_key, old = self._entries.popitem(last=False)
+            total -= old.cost()
+            for session_id in old.sessions:
+                self._sessions.get(session_id, {}).pop(old_key, None)
+                self._dropped.append((session_id, old_key))
+
+    def release_session(self, session_id: str) -> None:
+        """Drop a session's references, freeing datasets no one else uses.
+
+        Call when the session ends; until then the session's entry and the
+        datasets only it references stay resident.
+        """
+        with self._lock:
+            self._listeners.pop(session_id, None)
+            refs = self._sessions.pop(session_id, OrderedDict())
+            for key in refs:
+                entry = self._entries.get(key)
+                if entry is None:
+                    continue
+                entry.sessions.discard(session_id)
+                entry.derived.pop(session_id, None)
+                if not entry.sessions:
+                    del self._entries[key]
+
+    def stats(self) -> Dict[str, int]:
+        """Return current usage counters."""
+        with self._lock:
+            return {
+                "datasets": len(self._entries),
+                "sessions": len(self._sessions),
+                "bytes": sum(e.nbytes for e in self._entries.values()),
+                "derived_bytes": sum(e.cost() - e.nbytes for e in self._entries.values()),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
@@ -1,4 +1,5 @@
 """Report export module."""
 from .report import render_report_stub
+from .dataset import DATASET_FORMATS, export_dataset, write_dataset
 
-__all__ = ["render_report_stub"]
+__all__ = ["render_report_stub", "DATASET_FORMATS", "export_dataset", "write_dataset"]
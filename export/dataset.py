@@ -0,0 +1,169 @@
+"""Cleaned dataset export utilities."""
+import gzip
+from io import BytesIO
+from typing import Any, BinaryIO, Dict, List, Tuple
+
+import pandas as pd
+
+DATASET_FORMATS: Dict[str, Dict[str, str]] = {
+    "parquet": {"label": "Parquet", "extension": "parquet", "mime": "application/vnd.apache.parquet"},
+    "csv.gz": {"label": "CSV (gzip)", "extension": "csv.gz", "mime": "application/gzip"},
+    "xlsx": {
+        "label": "Excel (XLSX)",
+        "extension": "xlsx",
+        "mime": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    },
+}
+
+# Arrow type (pyarrow factory name) of object columns holding one kind of value,
+# by ``pd.api.types.infer_dtype``
+_PARQUET_OBJECT_TYPES = {
+    "string": "string",
+    "empty": "null",
+    "integer": "int64",
+    "floating": "float64",
+    "mixed-integer-float": "float64",
+    "boolean": "bool_",
+    "bytes": "binary",
+}
+
+# Hard limit of the XLSX format (excluding the header row)
+XLSX_MAX_ROWS = 1_048_575
+
+
+def _text_columns(chunk: pd.DataFrame, columns: List[str]) -> pd.DataFrame:
+    if not columns:
+        return chunk
+    return chunk.assign(**{c: chunk[c].map(str, na_action="ignore") for c in columns})
+
+
+def _parquet_schema(df: pd.DataFrame, chunk_rows: int, pa) -> Tuple[Any, List[str]]:
+    """Arrow schema for ``df`` without converting the whole frame to Arrow.
+
+    Column types come from the first chunk. Object columns are classified by
+    scanning their values in place, so an object column that only gets
+    floats (or any values) after the first chunk is typed for all of it, and
+    one mixing kinds of values (e.g. text and numbers) is written as text.
+
+    Returns:
+        (schema, object columns to write as text) tuple
+    """
+    kinds = {
+        col: pd.api.types.infer_dtype(df[col], skipna=True)
+        for col in df.columns if df[col].dtype == object
+    }
+    as_text = [col for col, kind in kinds.items() if kind.startswith("mixed") and kind not in _PARQUET_OBJECT_TYPES]
+    schema = pa.Schema.from_pandas(_text_columns(df.iloc[:chunk_rows], as_text), preserve_index=False)
+    for i, col in enumerate(df.columns):
+        if col not in kinds:
+            continue  # the dtype fixes the Arrow type of every chunk
+        if kinds[col] in _PARQUET_OBJECT_TYPES:
+            schema = schema.set(i, pa.field(str(col), getattr(pa, _PARQUET_OBJECT_TYPES[kinds[col]])()))
+        elif schema.field(i).type == pa.null():
+            # Missing throughout the first chunk: widen from the first chunk with values
+            for start in range(chunk_rows, len(df), chunk_rows):
+                values = df[col].iloc[start:start + chunk_rows].dropna()
+                if len(values):
+                    found = pa.schema([pa.field(str(col), pa.array(values, from_pandas=True).type)])
+                    schema = pa.unify_schemas([schema, found])
+                    break
+    return schema, as_text
+
+
+def _write_parquet(df: pd.DataFrame, target: BinaryIO, chunk_rows: int) -> None:
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as exc:
+        raise ImportError("Parquet export requires the 'pyarrow' package.") from exc
+
+    # One schema for every chunk, so chunks with all-null object columns
+    # don't disagree with each other
+    schema, as_text = _parquet_schema(df, chunk_rows, pa)
+    with pq.ParquetWriter(target, schema, compression="snappy") as writer:
+        for start in range(0, len(df), chunk_rows):
+            chunk = _text_columns(df.iloc[start:start + chunk_rows], as_text)
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+
+
+def _write_csv_gz(df: pd.DataFrame, target: BinaryIO, chunk_rows: int) -> None:
+    with gzip.GzipFile(fileobj=target, mode="wb", compresslevel=6) as gz:
+        if df.empty:
+            gz.write(df.to_csv(index=False).encode("utf-8"))
+            return
+        for start in range(0, len(df), chunk_rows):
+            chunk = df.iloc[start:start + chunk_rows]
+            gz.write(chunk.to_csv(index=False, header=start == 0).encode("utf-8"))
+
+
+def _write_xlsx(df: pd.DataFrame, target: BinaryIO, chunk_rows: int) -> None:
+    try:
+        from openpyxl import Workbook
+    except ImportError as exc:
+        raise ImportError("Excel export requires the 'openpyxl' package.") from exc
+
+    if len(df) > XLSX_MAX_ROWS:
+        raise ValueError(
+            f"Excel supports at most {XLSX_MAX_ROWS:,} data rows; "
+            f"this dataset has {len(df):,}. Use Parquet or CSV instead."
+        )
+
+    # Write-only mode streams rows to disk instead of keeping a cell tree in memory
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("data")
+    ws.append([str(c) for c in df.columns])
+    for start in range(0, len(df), chunk_rows):
+        chunk = df.iloc[start:start + chunk_rows]
+        # Timezone-aware datetimes are not supported by Excel
+        for col in chunk.columns:
+            if isinstance(chunk[col].dtype, pd.DatetimeTZDtype):
+                chunk = chunk.assign(**{col: chunk[col].dt.tz_localize(None)})
+        values = chunk.astype(object).where(chunk.notna(), None)
+        for row in values.itertuples(index=False, name=None):
+            ws.append(row)
+    wb.save(target)
+
+
+_WRITERS = {
+    "parquet": _write_parquet,
+    "csv.gz": _write_csv_gz,
+    "xlsx": _write_xlsx,
+}
+
+
+def write_dataset(df: pd.DataFrame, target: BinaryIO, fmt: str, chunk_rows: int = 50_000) -> None:
+    """Write a cleaned DataFrame to a binary file-like object in chunks.
+
+    The frame is serialized ``chunk_rows`` rows at a time, so only one chunk's
+    worth of converted values exists alongside the original frame.
+
+    Args:
+        df: Cleaned DataFrame (output of ``clean_dataframe``)
+        target: Writable binary file-like object
+        fmt: One of the keys of ``DATASET_FORMATS``
+        chunk_rows: Number of rows serialized per chunk
+    """
+    if fmt not in _WRITERS:
+        raise ValueError(f"Unsupported export format {fmt!r}; expected one of {list(_WRITERS)}")
+    _WRITERS[fmt](df, target, max(1, chunk_rows))
+
+
+def export_dataset(df: pd.DataFrame, fmt: str, chunk_rows: int = 50_000) -> bytes:
+    """Export a cleaned DataFrame to bytes in the given format.
+
+    The whole encoded file is held in memory; write large exports to a file
+    with ``write_dataset`` instead.
+
+    Args:
+        df: Cleaned DataFrame (output of ``clean_dataframe``)
+        fmt: One of the keys of ``DATASET_FORMATS``
+        chunk_rows: Number of rows serialized per chunk
+
+    Returns:
+        Encoded dataset as bytes
+    """
+    buffer = BytesIO()
+    write_dataset(df, buffer, fmt, chunk_rows)
+    data = buffer.getvalue()
+    buffer.close()
+    return data
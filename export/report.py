@@ -1,29 +1,205 @@
 """Report generation utilities."""
 from datetime import datetime
 from io import BytesIO
-from typing import List, Tuple
+from typing import Callable, Iterator, List, Optional, Tuple
 
 import pandas as pd
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import letter
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+from reportlab.lib.utils import ImageReader
+from reportlab.platypus import (
+    Flowable,
+    Image,
+    LongTable,
+    PageBreak,
+    Paragraph,
+    SimpleDocTemplate,
+    Spacer,
+    Table,
+    TableStyle,
+)
 
+ProgressCallback = Callable[[int, int], None]
 
-def render_report_stub(title: str, kpis: List[Tuple[str, str]], df: pd.DataFrame) -> bytes:
+_DATA_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1f77b4')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 10),
+    ('FONTSIZE', (0, 1), (-1, -1), 8),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+    ('TOPPADDING', (0, 0), (-1, -1), 6),
+    ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f9f9f9')]),
+])
+
+_APPENDIX_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1f77b4')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, -1), 7),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 2),
+    ('TOPPADDING', (0, 0), (-1, -1), 2),
+    ('GRID', (0, 0), (-1, -1), 0.25, colors.grey),
+    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f9f9f9')]),
+])
+
+_APPENDIX_CELL_CHARS = 40
+
+
+class _DeferredTableChunks(Flowable):
+    """Zero-size placeholder that expands into appendix tables one chunk at a time.
+
+    ReportLab normally needs every flowable up front. This marker is swapped
+    for the next chunk's table by ``_StreamingDocTemplate`` just before layout,
+    so only one chunk is materialized at any point during the build.
+    """
+
+    def __init__(self, tables: Iterator[Flowable]):
+        super().__init__()
+        self._tables = tables
+
+    def next_table(self) -> Optional[Flowable]:
+        return next(self._tables, None)
+
+    def wrap(self, availWidth, availHeight):
+        return (0, 0)
+
+    def draw(self):
+        pass
+
+
+class _StreamingDocTemplate(SimpleDocTemplate):
+    """Document template that expands ``_DeferredTableChunks`` lazily."""
+
+    def filterFlowables(self, flowables):
+        f = flowables[0]
+        if isinstance(f, _DeferredTableChunks):
+            table = f.next_table()
+            if table is None:
+                flowables[0] = None
+            else:
+                flowables[0:0] = [table]
+
+
+def _is_svg(data: bytes) -> bool:
+    head = data[:256].lstrip()
+    return head.startswith(b"<svg") or (head.startswith(b"<?xml") and b"<svg" in data[:1024])
+
+
+def _chart_flowable(data: bytes, width: float) -> Flowable:
+    """Wrap pre-rendered chart bytes (PNG or SVG) as a flowable scaled to ``width``."""
+    if _is_svg(data):
+        try:
+            from svglib.svglib import svg2rlg
+        except ImportError as exc:
+            raise ImportError(
+                "Embedding SVG charts requires the 'svglib' package; "
+                "install it or render charts as PNG."
+            ) from exc
+        drawing = svg2rlg(BytesIO(data))
+        scale = width / drawing.width
+        drawing.width, drawing.height = width, drawing.height * scale
+        drawing.scale(scale, scale)
+        return drawing
+
+    img_w, img_h = ImageReader(BytesIO(data)).getSize()
+    return Image(BytesIO(data), width=width, height=width * img_h / img_w)
+
+
+def _format_chunk(chunk: pd.DataFrame) -> List[List[str]]:
+    """Convert a DataFrame chunk into table rows of short display strings."""
+    text = chunk.astype(str).where(chunk.notna(), "")
+    text = text.apply(lambda s: s.str.slice(0, _APPENDIX_CELL_CHARS))
+    return text.values.tolist()
+
+
+def _iter_appendix_tables(
+    df: pd.DataFrame,
+    chunk_rows: int,
+    max_cols: int,
+    progress_callback: Optional[ProgressCallback],
+) -> Iterator[Flowable]:
+    """Yield the appendix as a sequence of repeated-header long tables.
+
+    Columns are split into bands of ``max_cols`` so every column fits the page
+    width; each band pages through the rows ``chunk_rows`` at a time.
+    """
+    n_rows = len(df)
+    col_bands = [
+        df.columns[i:i + max_cols] for i in range(0, df.shape[1], max_cols)
+    ]
+    total = n_rows * len(col_bands)
+    done = 0
+    available_width = 6.5 * inch
+    styles = getSampleStyleSheet()
+
+    for band_no, band in enumerate(col_bands, start=1):
+        if len(col_bands) > 1:
+            yield Paragraph(
+                f"Columns {band_no} of {len(col_bands)}: {', '.join(map(str, band))}",
+                styles['Heading4'],
+            )
+        header = [str(c)[:_APPENDIX_CELL_CHARS] for c in band]
+        col_width = available_width / len(band)
+        for start in range(0, n_rows, chunk_rows):
+            rows = _format_chunk(df.iloc[start:start + chunk_rows][band])
+            table = LongTable(
+                [header] + rows,
+                colWidths=[col_width] * len(band),
+                repeatRows=1,
+            )
+            table.setStyle(_APPENDIX_TABLE_STYLE)
+            done += len(rows)
+            if progress_callback is not None:
+                progress_callback(done, total)
+            yield table
+        if band_no < len(col_bands):
+            yield PageBreak()
+
+
+def render_report_stub(
+    title: str,
+    kpis: List[Tuple[str, str]],
+    df: pd.DataFrame,
+    charts: Optional[List[Tuple[str, bytes]]] = None,
+    metric_summary: Optional[List[List[str]]] = None,
+    include_appendix: bool = False,
+    appendix_chunk_rows: int = 500,
+    appendix_max_cols: int = 8,
+    progress_callback: Optional[ProgressCallback] = None,
+) -> bytes:
     """Render a professional PDF report with KPIs and data preview.
 
+    When ``include_appendix`` is set, the full DataFrame is appended after the
+    preview. The appendix is laid out lazily in chunks of
+    ``appendix_chunk_rows`` rows, so memory stays bounded by the chunk size
+    rather than the size of the DataFrame.
+
     Args:
         title: Report title
         kpis: List of (label, value) KPI tuples
         df: DataFrame to include in preview
+        charts: Optional list of (caption, image bytes) tuples. The bytes are
+            embedded as-is (PNG or SVG), so figures already rendered for the
+            dashboard are reused rather than re-plotted
+        metric_summary: Optional per-metric KPI rows, header row first
+        include_appendix: Whether to add a full-data appendix
+        appendix_chunk_rows: Rows laid out per appendix table chunk
+        appendix_max_cols: Maximum columns per appendix table before the
+            remaining columns move to a further band of pages
+        progress_callback: Optional callable receiving (rows_done, rows_total)
+            after each appendix chunk is laid out
 
     Returns:
         PDF report as bytes
     """
     buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=letter, topMargin=0.75*inch, bottomMargin=0.75*inch)
+    doc = _StreamingDocTemplate(buffer, pagesize=letter, topMargin=0.75*inch, bottomMargin=0.75*inch)
 
     # Container for the PDF elements
     elements = []
@@ -72,8 +248,31 @@ def render_report_stub(title: str, kpis: List[Tuple[str, str]], df: pd.DataFrame
     else:
         elements.append(Paragraph("No KPIs available", normal_style))
 
+    # Add per-metric summary
+    if metric_summary and len(metric_summary) > 1:
+        elements.append(Spacer(1, 0.3*inch))
+        elements.append(Paragraph("Metric Summary", heading_style))
+        elements.append(Spacer(1, 0.1*inch))
+        summary_table = Table(
+            metric_summary,
+            colWidths=[1.5*inch] + [1.0*inch] * (len(metric_summary[0]) - 1),
+            repeatRows=1,
+        )
+        summary_table.setStyle(_DATA_TABLE_STYLE)
+        elements.append(summary_table)
+
     elements.append(Spacer(1, 0.4*inch))
 
+    # Add charts section
+    if charts:
+        elements.append(Paragraph("Charts", heading_style))
+        elements.append(Spacer(1, 0.1*inch))
+        for caption, image_bytes in charts:
+            elements.append(Paragraph(caption, styles['Heading3']))
+            elements.append(_chart_flowable(image_bytes, 6.5*inch))
+            elements.append(Spacer(1, 0.2*inch))
+        elements.append(Spacer(1, 0.2*inch))
+
     # Add data preview section
     elements.append(Paragraph("Data Preview (First 10 Rows)", heading_style))
     elements.append(Spacer(1, 0.1*inch))
@@ -96,22 +295,23 @@ def render_report_stub(title: str, kpis: List[Tuple[str, str]], df: pd.DataFrame
 
         # Create table
         data_table = Table(table_data, colWidths=[col_width] * len(table_data[0]))
-        data_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1f77b4')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 10),
-            ('FONTSIZE', (0, 1), (-1, -1), 8),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-            ('TOPPADDING', (0, 0), (-1, -1), 6),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f9f9f9')]),
-        ]))
+        data_table.setStyle(_DATA_TABLE_STYLE)
         elements.append(data_table)
     else:
         elements.append(Paragraph("No data available", normal_style))
 
+    # Add full-data appendix
+    if include_appendix and not df.empty:
+        elements.append(PageBreak())
+        elements.append(Paragraph(f"Appendix: Full Data ({len(df):,} rows)", heading_style))
+        elements.append(Spacer(1, 0.1*inch))
+        elements.append(_DeferredTableChunks(_iter_appendix_tables(
+            df,
+            chunk_rows=max(1, appendix_chunk_rows),
+            max_cols=max(1, appendix_max_cols),
+            progress_callback=progress_callback,
+        )))
+
     # Build PDF
     doc.build(elements)
 
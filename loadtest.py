@@ -0,0 +1,275 @@
+"""Concurrent-session load test for the DataCanvas Streamlit app.
+
+Drives simulated sessions through ``app.main()`` with Streamlit's ``AppTest``
+(no browser or network): each session opens the app, uploads a CSV, waits
+for column detection, charts and the PDF report, toggles the multi-metric
+KPIs and clicks the report download button.
+
+At concurrency N, N sessions are open at once in one server process and
+share its runtime: the dataset store, job runner, section pool and caches,
+as N users of one ``streamlit run`` server would. ``AppTest`` can only run
+one script at a time per process, so the sessions take turns: in every
+round each session performs its next action, one after another. A rerun's
+response time is measured from the start of its round, when all N users
+act, so it includes waiting for the sessions served before it. This models
+a server executing one script run at a time; a server with parallel reruns
+on several cores would respond sooner, and since load jobs never overlap
+the job queue limit is not reached.
+
+Each level runs in a fresh process (the on-disk dataset cache in the
+working directory is kept); peak RSS is that process's high-water mark.
+
+Usage:
+    python loadtest.py --concurrency 1 2 4 8 --rows 50000
+"""
+import argparse
+import gc
+import io
+import multiprocessing
+import os
+import queue
+import resource
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+import numpy as np
+import pandas as pd
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+
+
+def make_csv(rows: int, seed: int) -> bytes:
+    """Generate a synthetic sales extract with dates, metrics and categories."""
+    rng = np.random.default_rng(seed)
+    dates = pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 365, rows), unit="D")
+    df = pd.DataFrame({
+        "Order Date": dates.strftime("%Y-%m-%d"),
+        "Revenue": np.round(rng.gamma(2.0, 50.0, rows), 2),
+        "Units": rng.integers(1, 20, rows),
+        "Region": rng.choice(["North", "South", "East", "West", "Central"], rows),
+        "Store ID": rng.integers(1, 200, rows),
+        "Note": rng.choice(["", "promo", "return", "online", "walk-in"], rows),
+    })
+    buffer = io.StringIO()
+    df.to_csv(buffer, index=False)
+    return buffer.getvalue().encode("utf-8")
+
+
+def current_rss_bytes() -> int:
+    """Resident set size of this process (Linux /proc)."""
+    with open("/proc/self/statm") as fh:
+        pages = int(fh.read().split()[1])
+    return pages * os.sysconf("SC_PAGE_SIZE")
+
+
+def peak_rss_bytes() -> int:
+    """Highest resident set size this process has reached (Linux reports KiB)."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _open(at, csv_bytes: bytes) -> None:
+    pass
+
+
+def _upload(at, csv_bytes: bytes) -> None:
+    at.file_uploader[0].set_value(("data.csv", csv_bytes, "text/csv"))
+
+
+def _toggle_kpis(at, csv_bytes: bytes) -> None:
+    toggle = next((cb for cb in at.checkbox if cb.label.startswith("Show KPIs for all")), None)
+    if toggle is None:
+        raise RuntimeError("KPI toggle not shown after upload")
+    toggle.check()
+
+
+def _download_report(at, csv_bytes: bytes) -> None:
+    button = next((b for b in at.download_button if "PDF" in b.proto.label), None)
+    if button is None:
+        raise RuntimeError("Report download button not shown")
+    button.click()
+
+
+# One simulated user's actions, each followed by the rerun it triggers
+ACTIONS: Dict[str, Callable[..., None]] = {
+    "open": _open,
+    "upload": _upload,          # detection, KPIs, charts, report
+    "toggle KPIs": _toggle_kpis,
+    "download report": _download_report,
+}
+
+
+def run_wave(csv_files: List[bytes], timeout: float) -> dict:
+    """Run one session per file at the same time, the sessions taking turns every round.
+
+    Returns:
+        Dict with the "response" times (from the start of each round) and
+        "service" times (the rerun alone) in seconds, and session "errors"
+    """
+    from streamlit.testing.v1 import AppTest
+
+    sessions = [AppTest.from_file(APP_PATH, default_timeout=timeout) for _ in csv_files]
+    active = list(range(len(sessions)))
+    response: List[float] = []
+    service: List[float] = []
+    errors: List[str] = []
+    for round_no, action in enumerate(ACTIONS.values()):
+        # Rotate who goes first, so no session always waits for all others
+        order = active[round_no % len(active):] + active[:round_no % len(active)] if active else []
+        round_start = time.perf_counter()
+        for i in order:
+            at = sessions[i]
+            try:
+                action(at, csv_files[i])
+                start = time.perf_counter()
+                at.run(timeout=timeout)
+                end = time.perf_counter()
+                if at.exception:
+                    raise RuntimeError(at.exception[0].value)
+            except Exception as exc:  # noqa: BLE001 - reported per session
+                errors.append(f"{type(exc).__name__}: {exc}")
+                active.remove(i)
+                continue
+            service.append(end - start)
+            response.append(end - round_start)
+    # Closing the sessions lets the app release their share of the store
+    del sessions
+    gc.collect()
+    return {"response": response, "service": service, "errors": errors}
+
+
+def _serve_level(workdir: str, waves: List[List[bytes]], timeout: float, results) -> None:
+    """Process body: one server runtime running every wave of sessions for a level."""
+    import matplotlib
+    matplotlib.use("Agg")
+    from streamlit.testing.v1 import AppTest
+    os.chdir(workdir)
+    try:
+        # Import the app and its dependencies before the clock starts
+        AppTest.from_file(APP_PATH, default_timeout=timeout).run()
+    except Exception as exc:  # noqa: BLE001 - reported for the whole level
+        results.put({"error": f"warm-up failed: {type(exc).__name__}: {exc}"})
+        return
+    baseline = current_rss_bytes()
+    start = time.perf_counter()
+    outcome = {"response": [], "service": [], "errors": []}
+    for csv_files in waves:
+        wave = run_wave(csv_files, timeout)
+        for name, values in wave.items():
+            outcome[name].extend(values)
+    outcome["elapsed"] = time.perf_counter() - start
+    outcome["baseline_rss"] = baseline
+    outcome["peak_rss"] = peak_rss_bytes()
+    results.put(outcome)
+
+
+def _wait_for_result(proc, results, deadline: float) -> dict:
+    """Wait for the level's result, giving up if its process dies or overruns the deadline."""
+    while True:
+        try:
+            return results.get(timeout=1.0)
+        except queue.Empty:
+            pass
+        if not proc.is_alive():
+            try:
+                # The result may have been sent just before the process exited
+                return results.get(timeout=1.0)
+            except queue.Empty:
+                return {"error": f"server process exited with code {proc.exitcode} (killed or crashed)"}
+        if time.monotonic() > deadline:
+            proc.kill()
+            return {"error": "server process did not finish before the level deadline"}
+
+
+def run_level(concurrency: int, waves: int, csv_files: List[bytes], timeout: float, workdir: str) -> dict:
+    """Run ``waves`` waves of ``concurrency`` simultaneous sessions in one fresh server process."""
+    ctx = multiprocessing.get_context("spawn")
+    results = ctx.Queue()
+    wave_files = [
+        [csv_files[(w * concurrency + i) % len(csv_files)] for i in range(concurrency)]
+        for w in range(waves)
+    ]
+    proc = ctx.Process(target=_serve_level, args=(workdir, wave_files, timeout, results), daemon=True)
+    proc.start()
+    # Every rerun may take up to ``timeout``, plus the warm-up
+    deadline = time.monotonic() + timeout * (1 + len(ACTIONS) * concurrency * waves)
+    outcome = _wait_for_result(proc, results, deadline)
+    proc.join(timeout=30)
+    if proc.is_alive():
+        proc.kill()
+
+    sessions = concurrency * waves
+    if "error" in outcome:
+        outcome = {"response": [], "service": [], "errors": [outcome["error"]] * sessions,
+                   "elapsed": 0.0, "baseline_rss": np.nan, "peak_rss": np.nan}
+    response = np.array(outcome["response"]) * 1000.0
+    service = np.array(outcome["service"]) * 1000.0
+    errors = outcome["errors"]
+    p50, p95, p99 = (np.percentile(response, [50, 95, 99]) if response.size else (np.nan,) * 3)
+    elapsed = outcome["elapsed"]
+    return {
+        "concurrency": concurrency,
+        "sessions": sessions,
+        "reruns": int(response.size),
+        "reruns/s": response.size / elapsed if elapsed else 0.0,
+        "p50 ms": p50,
+        "p95 ms": p95,
+        "p99 ms": p99,
+        "mean rerun ms": service.mean() if service.size else np.nan,
+        "base RSS MB": outcome["baseline_rss"] / 1024 / 1024,
+        "peak RSS MB": outcome["peak_rss"] / 1024 / 1024,
+        "errors": len(errors),
+        "_first_error": errors[0] if errors else None,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8],
+                        help="Concurrency levels to test, in order")
+    parser.add_argument("--waves", type=int, default=3,
+                        help="Waves of simultaneous sessions run back to back at each level")
+    parser.add_argument("--rows", type=int, default=20_000, help="Rows per generated CSV")
+    parser.add_argument("--csv", help="Upload this CSV in every session instead of generated data")
+    parser.add_argument("--shared-file", action="store_true",
+                        help="Every session uploads the same file (exercises dataset sharing and the disk cache)")
+    parser.add_argument("--timeout", type=float, default=300.0, help="Per-rerun timeout in seconds")
+    args = parser.parse_args()
+
+    shared_file = None
+    if args.csv:
+        with open(args.csv, "rb") as fh:
+            shared_file = fh.read()
+    elif args.shared_file:
+        shared_file = make_csv(args.rows, seed=0)
+
+    # Run in a scratch directory so the on-disk dataset cache starts empty
+    workdir = tempfile.mkdtemp(prefix="datacanvas-loadtest-")
+    os.chdir(workdir)
+    print(f"Working directory: {workdir}\n")
+
+    rows = []
+    seed = 0
+    for concurrency in args.concurrency:
+        sessions = concurrency * args.waves
+        if shared_file is not None:
+            csv_files = [shared_file]
+        else:
+            # Fresh files per level so earlier levels don't warm the caches
+            csv_files = [make_csv(args.rows, seed=seed + i) for i in range(sessions)]
+            seed += sessions
+        row = run_level(concurrency, args.waves, csv_files, args.timeout, workdir)
+        rows.append(row)
+        if row["_first_error"]:
+            print(f"  concurrency {concurrency}: first error: {row['_first_error']}")
+
+    report = pd.DataFrame(rows).drop(columns="_first_error")
+    print(report.to_string(index=False, float_format=lambda v: f"{v:,.1f}"))
+    print(
+        "\nSessions of a level share one server process and take turns; latencies run from the "
+        "moment all sessions act and include waiting for the others (see the module docstring)."
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,22 @@
+"""Pipeline execution module."""
+from .dashboard import DASHBOARD_INPUTS, build_dashboard_graph, derived_nbytes, release_dataset, set_dataset
+from .graph import Graph
+from .jobs import Job, JobCancelled, JobQueueFull, JobRunner
+from .loading import load_dataset
+from .watch import FolderWatcher, WatchPass
+
+__all__ = [
+    "DASHBOARD_INPUTS",
+    "FolderWatcher",
+    "Graph",
+    "Job",
+    "JobCancelled",
+    "JobQueueFull",
+    "JobRunner",
+    "WatchPass",
+    "build_dashboard_graph",
+    "derived_nbytes",
+    "load_dataset",
+    "release_dataset",
+    "set_dataset",
+]
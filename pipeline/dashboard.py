@@ -0,0 +1,242 @@
+"""Dashboard stages wired as a memoized dependency graph."""
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import pandas as pd
+
+from analytics import compute_kpis, compute_metric_summary, format_metric_summary
+from data import LookupIndex, drop_duplicate_rows, profile_columns
+from data.store import frame_nbytes
+from export import render_report_stub
+from visualization import aggregate_categories, aggregate_trend, plot_category_chart, plot_trend_chart, render_figure
+
+from .graph import Graph
+
+ROLES = ("date_col", "metric_col", "category_col")
+
+# Inputs set by the app on every rerun; unchanged values invalidate nothing
+DASHBOARD_INPUTS = (
+    "df",
+    "meta",
+    "lookup",
+    "lookup_on",
+    "dedupe",
+    "dedupe_subset",
+    "date_override",
+    "metric_override",
+    "category_override",
+    "show_metric_summary",
+    "report_title",
+    "top_n",
+    "chart_format",
+    "chart_dpi",
+)
+
+
+def _choose(role: str):
+    """Node function picking the user's override for ``role``, else the inferred column."""
+    def choose(inferred: Dict[str, Optional[str]], override: Optional[str]) -> Optional[str]:
+        return override if override else inferred.get(role)
+    return choose
+
+
+def _enrich(
+    df: pd.DataFrame,
+    lookup: Optional[LookupIndex],
+    on: Optional[str],
+) -> Tuple[pd.DataFrame, Optional[Dict[str, Any]]]:
+    if lookup is None or on not in df.columns:
+        return df, None
+    return lookup.join(df, on)
+
+
+def _dedupe(
+    df: pd.DataFrame,
+    enabled: bool,
+    subset: Optional[Tuple[str, ...]],
+) -> Tuple[pd.DataFrame, int]:
+    if not enabled:
+        return df, 0
+    return drop_duplicate_rows(df, [c for c in subset or () if c in df.columns])
+
+
+def _kpis_with_duplicates(
+    df: pd.DataFrame,
+    dropped: int,
+    date_col: Optional[str],
+    metric_col: Optional[str],
+) -> Optional[List[Tuple[str, str]]]:
+    if not dropped:
+        return None
+    return compute_kpis(df, date_col, metric_col)
+
+
+def _trend_agg(df: pd.DataFrame, date_col: Optional[str], metric_col: Optional[str]) -> Optional[pd.Series]:
+    if not (date_col and metric_col):
+        return None
+    return aggregate_trend(df, date_col, metric_col)
+
+
+def _category_agg(
+    df: pd.DataFrame,
+    category_col: Optional[str],
+    metric_col: Optional[str],
+    top_n: int,
+) -> Optional[Tuple[pd.Series, Optional[str]]]:
+    if not category_col:
+        return None
+    return aggregate_categories(df, category_col, metric_col, top_n)
+
+
+def _trend_chart(trend: Optional[pd.Series], metric_col: Optional[str], fmt: str, dpi: int) -> Optional[bytes]:
+    if trend is None:
+        return None
+    return render_figure(plot_trend_chart(trend, metric_col), fmt, dpi)
+
+
+def _category_chart(
+    categories: Optional[Tuple[pd.Series, Optional[str]]],
+    category_col: Optional[str],
+    top_n: int,
+    fmt: str,
+    dpi: int,
+) -> Optional[bytes]:
+    if categories is None:
+        return None
+    agg, summed = categories
+    return render_figure(plot_category_chart(agg, category_col, summed, top_n), fmt, dpi)
+
+
+def _report_charts(
+    trend_chart: Optional[bytes],
+    category_chart: Optional[bytes],
+    metric_col: Optional[str],
+    category_col: Optional[str],
+    top_n: int,
+) -> List[Tuple[str, bytes]]:
+    charts = []
+    if trend_chart is not None:
+        charts.append((f"{metric_col} over time", trend_chart))
+    if category_chart is not None:
+        charts.append((f"Top {top_n} {category_col}", category_chart))
+    return charts
+
+
+def _metric_summary(df: pd.DataFrame, date_col: Optional[str], show: bool) -> Optional[List[List[str]]]:
+    if not show:
+        return None
+    rows = format_metric_summary(compute_metric_summary(df, date_col))
+    return rows if len(rows) > 1 else None
+
+
+def build_dashboard_graph() -> Graph:
+    """Build the graph of dashboard stages for one session.
+
+    Reading and cleaning run in a background job and are memoized per
+    upload by the shared dataset store and the on-disk cache; their result
+    enters the graph as the ``df`` and ``meta`` inputs (set with the content
+    hash as token). From there:
+
+    - ``enrichment`` joins the ``lookup`` table's attributes onto the
+      ``lookup_on`` column, giving ``enriched``; without a lookup table it is
+      ``df`` itself
+    - ``profile`` summarizes ``enriched``; ``infer`` takes the detected
+      columns from ``meta``
+    - ``deduped`` drops repeated rows when ``dedupe`` is on (on the
+      ``dedupe_subset`` key columns, or all columns); ``data`` is the
+      resulting frame used by every stage below
+    - ``date_col``, ``metric_col`` and ``category_col`` pick an override or
+      the inferred column
+    - ``kpis``, ``metric_summary``, ``trend_agg`` and ``category_agg`` read
+      ``data`` and the columns they use; ``kpis_with_duplicates`` computes
+      the KPIs on ``enriched`` too when rows were dropped, for comparison
+    - ``trend_chart`` and ``category_chart`` render the aggregates
+    - ``report_charts`` and ``report`` assemble the PDF
+
+    Each ``*_override`` input replaces the inferred column for one role, so
+    changing the category column re-runs only ``category_agg``,
+    ``category_chart`` and what depends on them.
+
+    Returns:
+        Graph with all ``DASHBOARD_INPUTS`` declared (initially None)
+    """
+    g = Graph()
+    for name in DASHBOARD_INPUTS:
+        g.add_input(name)
+
+    g.add_node("enrichment", _enrich, ["df", "lookup", "lookup_on"])
+    g.add_node("enriched", lambda enrichment: enrichment[0], ["enrichment"])
+    g.add_node("enrichment_stats", lambda enrichment: enrichment[1], ["enrichment"])
+    g.add_node("profile", profile_columns, ["enriched"])
+    g.add_node("infer", lambda meta: {role: meta.get(role) for role in ROLES}, ["meta"])
+    for role in ROLES:
+        g.add_node(role, _choose(role), ["infer", role.replace("_col", "_override")])
+
+    g.add_node("deduped", _dedupe, ["enriched", "dedupe", "dedupe_subset"])
+    g.add_node("data", lambda deduped: deduped[0], ["deduped"])
+    g.add_node("duplicates_dropped", lambda deduped: deduped[1], ["deduped"])
+
+    g.add_node("kpis", compute_kpis, ["data", "date_col", "metric_col"])
+    g.add_node(
+        "kpis_with_duplicates", _kpis_with_duplicates, ["enriched", "duplicates_dropped", "date_col", "metric_col"]
+    )
+    g.add_node("metric_summary", _metric_summary, ["data", "date_col", "show_metric_summary"])
+    g.add_node("trend_agg", _trend_agg, ["data", "date_col", "metric_col"])
+    g.add_node("category_agg", _category_agg, ["data", "category_col", "metric_col", "top_n"])
+    g.add_node("trend_chart", _trend_chart, ["trend_agg", "metric_col", "chart_format", "chart_dpi"])
+    g.add_node(
+        "category_chart", _category_chart, ["category_agg", "category_col", "top_n", "chart_format", "chart_dpi"]
+    )
+    g.add_node(
+        "report_charts",
+        _report_charts,
+        ["trend_chart", "category_chart", "metric_col", "category_col", "top_n"],
+    )
+    g.add_node(
+        "report",
+        lambda title, kpis, df, charts, summary: render_report_stub(
+            title, kpis, df, charts=charts, metric_summary=summary
+        ),
+        ["report_title", "kpis", "data", "report_charts", "metric_summary"],
+    )
+    return g
+
+
+def set_dataset(graph: Graph, df: pd.DataFrame, meta: Dict[str, Any], key: str) -> None:
+    """Feed a loaded dataset into the graph; ``key`` identifies its content."""
+    graph.set_input("df", df, token=key)
+    graph.set_input("meta", meta, token=key)
+
+
+def release_dataset(graph: Graph, key: str) -> None:
+    """Drop a dataset fed with ``set_dataset`` and everything computed from it.
+
+    Does nothing if the graph has moved on to another dataset; deferred
+    while the graph is in use (see ``Graph.in_use``).
+    """
+    graph.release(key)
+
+
+def _value_nbytes(value: Any, seen: Set[int]) -> int:
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    if isinstance(value, pd.DataFrame):
+        return frame_nbytes(value)
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True, deep=True))
+    if isinstance(value, bytes):
+        return len(value)
+    if isinstance(value, (list, tuple)):
+        return sum(_value_nbytes(item, seen) for item in value)
+    return 0
+
+
+def derived_nbytes(graph: Graph) -> int:
+    """Approximate memory held by the graph's computed values, beyond the dataset itself.
+
+    Counts frames, series and rendered bytes (joined and deduplicated
+    copies, aggregates, charts, the report) once each; nodes passing the
+    dataset through unchanged cost nothing.
+    """
+    seen = {id(graph.get("df"))}
+    return sum(_value_nbytes(value, seen) for value in graph.computed().values())
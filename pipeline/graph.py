@@ -0,0 +1,231 @@
+"""Memoized dependency graph for incremental recomputation."""
+import threading
+from collections import defaultdict
+from concurrent.futures import Executor, Future
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Sequence, Set, Tuple
+
+_SCALARS = (str, bytes, int, float, bool, type(None))
+_UNSET = object()
+
+
+def _same(a: Any, b: Any) -> bool:
+    """Cheap equality used for early cutoff: identity, or equal plain values.
+
+    Containers of plain values are compared structurally; anything else
+    (DataFrames, figures) only counts as unchanged if it is the same object.
+    """
+    if a is b:
+        return True
+    if type(a) is not type(b):
+        return False
+    if isinstance(a, _SCALARS):
+        return a == b
+    if isinstance(a, (list, tuple)):
+        return len(a) == len(b) and all(_same(x, y) for x, y in zip(a, b))
+    if isinstance(a, dict):
+        return a.keys() == b.keys() and all(_same(a[k], b[k]) for k in a)
+    return False
+
+
+class Graph:
+    """Pull-based graph of memoized computation nodes.
+
+    Inputs are values set from outside (data, user choices); nodes are
+    functions of inputs and other nodes. Every input and node carries a
+    version number. ``get`` computes a node only when the versions of its
+    dependencies differ from those it last ran with, so changing one input
+    re-runs just the nodes downstream of it, and only when they are
+    requested. A node whose new value equals its old one (for plain values)
+    keeps its version, which stops invalidation from spreading further.
+
+    ``get`` may be called from several threads at once (see ``submit``).
+    Each node is computed under its own lock, so a node shared by two
+    requests runs once while the second caller waits for it; locks are
+    taken in dependency order, which cannot deadlock in an acyclic graph.
+
+    ``release`` drops the values computed from a dataset so its memory can
+    be freed while the graph itself lives on (see ``in_use``).
+
+    Example:
+        >>> g = Graph()
+        >>> g.add_input("x", 2)
+        >>> g.add_node("square", lambda x: x * x, ["x"])
+        >>> g.get("square")
+        4
+    """
+
+    def __init__(self):
+        self._inputs: Set[str] = set()
+        self._nodes: Dict[str, Tuple[Callable[..., Any], Tuple[str, ...]]] = {}
+        self._values: Dict[str, Any] = {}
+        self._tokens: Dict[str, Any] = {}
+        self._versions: Dict[str, int] = {}
+        self._seen: Dict[str, Tuple[int, ...]] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._input_lock = threading.Lock()
+        self._use_lock = threading.Lock()
+        self._users = 0
+        self._pending_release: List[Any] = []
+        self.runs: Dict[str, int] = defaultdict(int)
+        self.recomputed: List[str] = []
+
+    def add_input(self, name: str, value: Any = None) -> None:
+        """Declare an input with an initial value."""
+        self._check_new(name)
+        self._inputs.add(name)
+        self._values[name] = value
+        self._versions[name] = 0
+
+    def add_node(self, name: str, fn: Callable[..., Any], deps: Sequence[str]) -> None:
+        """Declare a node computed as ``fn(*values of deps)``.
+
+        Args:
+            name: Node name
+            fn: Function receiving the dependency values positionally
+            deps: Names of inputs or previously declared nodes
+        """
+        self._check_new(name)
+        missing = [d for d in deps if d not in self._inputs and d not in self._nodes]
+        if missing:
+            raise KeyError(f"Node {name!r} depends on undeclared {missing}")
+        self._nodes[name] = (fn, tuple(deps))
+        self._versions[name] = 0
+        self._locks[name] = threading.Lock()
+
+    def _check_new(self, name: str) -> None:
+        if name in self._inputs or name in self._nodes:
+            raise ValueError(f"{name!r} is already declared")
+
+    def set_input(self, name: str, value: Any, token: Any = _UNSET) -> bool:
+        """Set an input, invalidating dependents only if it changed.
+
+        Args:
+            name: Input name
+            value: New value
+            token: Optional cheap identity for the value (e.g. a content hash)
+                compared instead of the value itself
+
+        Returns:
+            True if the input changed
+        """
+        if name not in self._inputs:
+            raise KeyError(f"Unknown input {name!r}")
+        with self._input_lock:
+            if token is not _UNSET:
+                changed = name not in self._tokens or not _same(self._tokens[name], token)
+                self._tokens[name] = token
+            else:
+                changed = not _same(self._values[name], value)
+            self._values[name] = value
+            if changed:
+                self._versions[name] += 1
+        return changed
+
+    def get(self, name: str) -> Any:
+        """Return the value of an input or node, recomputing only if stale."""
+        return self._get(name)[0]
+
+    def _get(self, name: str) -> Tuple[Any, int]:
+        # Values are returned with the version they were read at, so an input
+        # set by another thread mid-computation can't be recorded as seen
+        if name in self._inputs:
+            with self._input_lock:
+                return self._values[name], self._versions[name]
+        fn, deps = self._nodes[name]
+        with self._locks[name]:
+            resolved = [self._get(dep) for dep in deps]
+            dep_versions = tuple(version for _, version in resolved)
+            if name in self._seen and self._seen[name] == dep_versions:
+                return self._values[name], self._versions[name]
+
+            value = fn(*(value for value, _ in resolved))
+            self.runs[name] += 1
+            self.recomputed.append(name)
+            if name not in self._seen or not _same(self._values[name], value):
+                self._versions[name] += 1
+            self._values[name] = value
+            self._seen[name] = dep_versions
+            return value, self._versions[name]
+
+    def submit(self, names: Sequence[str], executor: Executor) -> Dict[str, Future]:
+        """Start computing several nodes concurrently.
+
+        Nodes that are already up to date resolve immediately; shared
+        upstream nodes are computed once. Node functions run in the
+        executor's threads, so they must not touch thread-bound state (such
+        as the pyplot figure manager).
+
+        Args:
+            names: Nodes to compute
+            executor: Executor running one ``get`` per node
+
+        Returns:
+            Dict mapping each name to a future of its value
+        """
+        return {name: executor.submit(self.get, name) for name in names}
+
+    def computed(self) -> Dict[str, Any]:
+        """Return the value of every node computed so far, without computing any."""
+        values = dict(self._values)
+        return {name: values[name] for name in list(self._seen) if name in values}
+
+    @contextmanager
+    def in_use(self) -> Iterator["Graph"]:
+        """Hold off ``release`` while the caller reads from the graph.
+
+        A release requested inside the block (by another thread) happens
+        when the last holder leaves it, so a run never sees its inputs reset
+        halfway through.
+        """
+        with self._use_lock:
+            self._users += 1
+        try:
+            yield self
+        finally:
+            with self._use_lock:
+                self._users -= 1
+                if not self._users:
+                    pending, self._pending_release = self._pending_release, []
+                    for token in pending:
+                        self._release(token)
+
+    def release(self, token: Any) -> None:
+        """Reset the inputs set with ``token`` to None and forget every computed value.
+
+        Frees the memory the graph holds for that data; the next ``get``
+        recomputes from whatever inputs are set again. Nothing happens if no
+        input carries ``token`` (any more). Deferred while the graph is
+        ``in_use``.
+        """
+        with self._use_lock:
+            if self._users:
+                self._pending_release.append(token)
+            else:
+                self._release(token)
+
+    def _release(self, token: Any) -> None:
+        # Dependents are declared after their dependencies, so reversed
+        # declaration order takes the locks in the same order as ``_get``
+        locks = [self._locks[name] for name in reversed(list(self._nodes))]
+        for lock in locks:
+            lock.acquire()
+        try:
+            with self._input_lock:
+                names = [name for name, held in self._tokens.items() if _same(held, token)]
+                for name in names:
+                    del self._tokens[name]
+                    self._values[name] = None
+                    self._versions[name] += 1
+            if names:
+                for name in self._nodes:
+                    self._values.pop(name, None)
+                    self._seen.pop(name, None)
+        finally:
+            for lock in locks:
+                lock.release()
+
+    def take_recomputed(self) -> List[str]:
+        """Return and clear the names of nodes computed since the last call."""
+        recomputed, self.recomputed = self.recomputed, []
+        return recomputed
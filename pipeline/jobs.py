@@ -0,0 +1,122 @@
+"""Background job execution for the heavy data pipeline."""
+import threading
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
+from typing import Any, Callable, Optional, Tuple
+
+
+class JobCancelled(Exception):
+    """Raised inside a job when it has been cancelled."""
+
+
+class JobQueueFull(Exception):
+    """Raised when submitting while the runner's queue is at capacity."""
+
+
+class Job:
+    """Handle on a pipeline run executing in a worker thread.
+
+    The job function receives the ``Job`` itself and calls ``report`` at
+    stage boundaries and from progress callbacks. ``report`` raises
+    ``JobCancelled`` once the job is cancelled, so cancellation takes effect
+    at the next progress checkpoint.
+
+    Args:
+        key: Identifier of the work (e.g. upload content hash)
+    """
+
+    def __init__(self, key: str):
+        self.key = key
+        self.future: Optional[Future] = None
+        self._cancelled = threading.Event()
+        self._lock = threading.Lock()
+        self._progress: Tuple[str, int, int] = ("Queued", 0, 0)
+
+    def report(self, stage: str, done: int = 0, total: int = 0) -> None:
+        """Record stage-level progress; raises ``JobCancelled`` if cancelled.
+
+        Args:
+            stage: Human-readable stage name
+            done: Units completed within the stage
+            total: Total units in the stage (0 if unknown)
+        """
+        if self._cancelled.is_set():
+            raise JobCancelled(self.key)
+        with self._lock:
+            self._progress = (stage, done, total)
+
+    def progress_callback(self, stage: str) -> Callable[[int, int], None]:
+        """Return a (done, total) callback reporting progress for ``stage``."""
+        return lambda done, total: self.report(stage, done, total)
+
+    @property
+    def progress(self) -> Tuple[str, int, int]:
+        """Latest (stage, done, total) progress report."""
+        with self._lock:
+            return self._progress
+
+    def cancel(self) -> None:
+        """Cancel the job: drop it if still queued, otherwise stop at the next checkpoint."""
+        self._cancelled.set()
+        if self.future is not None:
+            self.future.cancel()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def done(self) -> bool:
+        return self.future is not None and self.future.done()
+
+    def result(self) -> Any:
+        """Return the job's result, re-raising its exception if it failed."""
+        try:
+            return self.future.result()
+        except CancelledError as exc:
+            raise JobCancelled(self.key) from exc
+
+
+class JobRunner:
+    """Bounded worker pool for pipeline jobs.
+
+    At most ``max_workers`` jobs run at once; at most ``max_pending`` may be
+    running or waiting in total, beyond which ``submit`` raises
+    ``JobQueueFull`` so a burst of uploads cannot pile up unbounded work.
+
+    Args:
+        max_workers: Number of worker threads
+        max_pending: Maximum number of submitted, unfinished jobs
+    """
+
+    def __init__(self, max_workers: int, max_pending: int):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="datacanvas-job")
+        self._slots = threading.BoundedSemaphore(max(max_pending, max_workers))
+
+    def submit(self, key: str, fn: Callable[[Job], Any]) -> Job:
+        """Submit ``fn(job)`` for background execution.
+
+        Args:
+            key: Identifier of the work
+            fn: Callable receiving the ``Job`` handle
+
+        Returns:
+            The submitted ``Job``
+        """
+        if not self._slots.acquire(blocking=False):
+            raise JobQueueFull("Too many jobs in progress; please retry shortly.")
+        job = Job(key)
+
+        def run() -> Any:
+            job.report("Starting")
+            return fn(job)
+
+        try:
+            job.future = self._executor.submit(run)
+        except BaseException:
+            self._slots.release()
+            raise
+        job.future.add_done_callback(lambda _: self._slots.release())
+        return job
+
+    def shutdown(self) -> None:
+        """Cancel queued jobs and stop accepting new ones."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
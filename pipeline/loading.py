@@ -0,0 +1,115 @@
+"""Loading an uploaded CSV into a cleaned DataFrame, with caching."""
+import io
+from typing import Any, Dict, Optional, Tuple
+
+import pandas as pd
+
+from data import (
+    DatasetCache,
+    SchemaCache,
+    clean_dataframe,
+    infer_column_roles,
+    read_csv,
+    read_csv_projected,
+    schema_fingerprint,
+)
+
+from .jobs import Job
+
+
+def load_dataset(
+    data: bytes,
+    file_key: str,
+    cache: Optional[DatasetCache],
+    job: Optional[Job] = None,
+    use_arrow: bool = False,
+    schemas: Optional[SchemaCache] = None,
+    projected: bool = False,
+    sample_rows: int = 10_000,
+    preview_rows: int = 25,
+) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """Read, clean and infer columns for an upload, using the on-disk cache.
+
+    Uploads whose column layout was seen before reuse the remembered date
+    and number formats and column roles instead of re-running detection;
+    if they no longer fit, the freshly detected schema replaces them.
+
+    With ``projected``, cleaning and inference run on the first
+    ``sample_rows`` rows only, and the file is then re-read
+    for just the date, metric and category columns. The returned frame
+    holds those columns; the raw preview still shows every column.
+
+    Runs in a background worker (or the folder watcher), so it must not
+    call Streamlit; progress is reported through ``job`` instead.
+
+    Args:
+        data: Raw bytes of the upload
+        file_key: Content hash of the upload
+        cache: On-disk dataset cache, or None if disabled
+        job: Job handle used for progress reporting and cancellation; a
+            private one is used if None
+        use_arrow: Parse into pyarrow-backed dtypes
+        schemas: Cache of remembered column layouts, or None if disabled
+        projected: Infer on a row sample and load only the columns in use
+        sample_rows: Rows used for inference in projected mode
+        preview_rows: Rows of raw data kept for the preview
+
+    Returns:
+        (cleaned DataFrame, metadata) tuple; metadata holds the inferred
+        columns, the raw shape, a raw preview (when parsed) and the source
+    """
+    if job is None:
+        job = Job(file_key)
+    job.report("Checking cache")
+    cached = cache.get(file_key) if cache is not None else None
+    if cached is not None:
+        df, meta = cached
+        meta["source"] = "disk cache"
+        return df, meta
+
+    if projected:
+        # Phase 1: cleaning heuristics and inference on a bounded row sample
+        job.report("Reading sample")
+        df_raw = read_csv(io.BytesIO(data), use_arrow=use_arrow, nrows=sample_rows)
+    else:
+        df_raw = read_csv(io.BytesIO(data), job.progress_callback("Reading CSV (bytes)"), use_arrow=use_arrow)
+    fingerprint = schema_fingerprint(df_raw)
+    hints = schemas.get(fingerprint) if schemas is not None else None
+    df = clean_dataframe(df_raw, job.progress_callback("Cleaning (columns)"), hints=hints)
+
+    job.report("Detecting column types")
+    roles, roles_reused = infer_column_roles(df, hints.get("roles") if hints else None)
+    schema_reused = hints is not None and roles_reused and df.attrs.get("schema_hints_valid") is True
+    if schemas is not None and not schema_reused:
+        schemas.put(fingerprint, {
+            "date_formats": df.attrs.get("date_formats", {}),
+            "number_formats": df.attrs.get("number_formats", {}),
+            "roles": roles,
+        })
+
+    columns = [c for c in dict.fromkeys(roles.values()) if c]
+    projected = projected and bool(columns)
+    if projected:
+        # Phase 2: parse only the columns the dashboard uses, with the sample's formats
+        df = read_csv_projected(
+            io.BytesIO(data), df_raw, df, columns, job.progress_callback("Reading CSV (bytes)"), use_arrow
+        )
+        roles, _ = infer_column_roles(df, roles)
+    meta = {
+        **roles,
+        "schema_reused": schema_reused,
+        "schema_hints_rejected": df.attrs.get("schema_hints_valid") is False,
+        "projected": projected,
+        "raw_rows": len(df) if projected else len(df_raw),
+        "raw_columns": len(df_raw.columns),
+        "dtype_backend": "pyarrow" if use_arrow else "numpy",
+        "number_formats": df.attrs.get("number_formats", {}),
+    }
+
+    if cache is not None:
+        job.report("Saving to cache")
+        cache.put(file_key, df, meta)
+
+    meta["raw_preview"] = df_raw.head(preview_rows)
+    meta["source"] = "parsed"
+    return df, meta
@@ -0,0 +1,227 @@
+"""Watch-folder mode: regenerate reports when CSV extracts appear or change."""
+import fnmatch
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from data import DatasetCache, SchemaCache, atomic_write, content_hash
+
+from .dashboard import build_dashboard_graph, set_dataset
+from .jobs import Job
+from .loading import load_dataset
+
+MANIFEST_NAME = ".watch_manifest.json"
+
+
+@dataclass
+class WatchPass:
+    """Outcome of one scan of the watched directory."""
+    generated: List[str] = field(default_factory=list)
+    unchanged: List[str] = field(default_factory=list)
+    pending: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    failed: Dict[str, str] = field(default_factory=dict)
+
+
+class FolderWatcher:
+    """Regenerate a PDF report and KPI JSON for every CSV in a directory.
+
+    Each pass costs one ``stat`` per unchanged file: a file is read and
+    hashed only when its size or modification time differs from the last
+    pass, and reprocessed only when its content hash differs too (so a
+    touched but identical file is skipped). Files modified within the last
+    ``settle_seconds`` are left for a later pass, since they may still be
+    being written.
+
+    Changed files go through the same stages as an upload in the app:
+    loading reuses the on-disk dataset cache (a file reverted to earlier
+    content is not re-parsed) and the schema cache (a refreshed extract
+    with the same layout skips format detection and column inference),
+    then the dashboard graph computes KPIs, charts and the report.
+
+    What was processed is kept in a manifest in ``output_dir``, so a
+    restarted watcher does not regenerate reports for unchanged files.
+    A file that fails to process has the outputs of its previous version
+    removed, so they can't pass for current ones; outputs of deleted files
+    are left in place.
+
+    Args:
+        directory: Directory to watch (not recursive)
+        output_dir: Directory receiving ``<name>.pdf`` and ``<name>.kpis.json``
+        cache: On-disk dataset cache, or None
+        schemas: Cache of remembered column layouts, or None
+        pattern: Glob of file names to process
+        settle_seconds: Minimum age of a file's last modification
+        chart_format: Chart image format embedded in the report
+        chart_dpi: Chart resolution
+        top_n: Categories shown in the category chart
+        use_arrow: Parse into pyarrow-backed dtypes
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        output_dir: str,
+        cache: Optional[DatasetCache] = None,
+        schemas: Optional[SchemaCache] = None,
+        pattern: str = "*.csv",
+        settle_seconds: float = 2.0,
+        chart_format: str = "png",
+        chart_dpi: int = 110,
+        top_n: int = 5,
+        use_arrow: bool = False,
+    ):
+        self.directory = directory
+        self.output_dir = output_dir
+        self.cache = cache
+        self.schemas = schemas
+        self.pattern = pattern
+        self.settle_seconds = settle_seconds
+        self.chart_format = chart_format
+        self.chart_dpi = chart_dpi
+        self.top_n = top_n
+        self.use_arrow = use_arrow
+        os.makedirs(output_dir, exist_ok=True)
+        self._manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+        self._manifest: Dict[str, Dict[str, Any]] = self._load_manifest()
+
+    def _load_manifest(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self._manifest_path, encoding="utf-8") as fh:
+                return json.load(fh)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_manifest(self) -> None:
+        manifest = json.dumps(self._manifest, indent=2, sort_keys=True).encode("utf-8")
+        atomic_write(self._manifest_path, lambda fh: fh.write(manifest))
+
+    def output_paths(self, name: str) -> Dict[str, str]:
+        """Paths of the report and KPI JSON generated for file ``name``."""
+        stem = os.path.splitext(name)[0]
+        return {
+            "report": os.path.join(self.output_dir, f"{stem}.pdf"),
+            "kpis": os.path.join(self.output_dir, f"{stem}.kpis.json"),
+        }
+
+    def _remove_outputs(self, name: str) -> None:
+        """Delete the outputs of an earlier version, so they don't pass for current ones."""
+        for path in self.output_paths(name).values():
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def _outputs_exist(self, name: str) -> bool:
+        return all(os.path.exists(path) for path in self.output_paths(name).values())
+
+    def scan(self) -> WatchPass:
+        """Process every new or changed file once and return what happened."""
+        result = WatchPass()
+        now = time.time()
+        seen = set()
+        dirty = False
+        with os.scandir(self.directory) as entries:
+            files = sorted(
+                (e for e in entries if e.is_file() and fnmatch.fnmatch(e.name, self.pattern)),
+                key=lambda e: e.name,
+            )
+        for entry in files:
+            name = entry.name
+            seen.add(name)
+            stat = entry.stat()
+            signature = [stat.st_size, stat.st_mtime_ns]
+            known = self._manifest.get(name)
+            if known is not None and known["signature"] == signature and (
+                "error" in known or self._outputs_exist(name)
+            ):
+                result.unchanged.append(name)
+                continue
+            if now - stat.st_mtime < self.settle_seconds:
+                result.pending.append(name)
+                continue
+
+            with open(entry.path, "rb") as fh:
+                data = fh.read()
+            digest = content_hash(data, "arrow" if self.use_arrow else "numpy", "full")
+            dirty = True
+            if known is not None and known.get("content_hash") == digest and (
+                "error" in known or self._outputs_exist(name)
+            ):
+                # Touched but identical: remember the new signature only
+                known["signature"] = signature
+                result.unchanged.append(name)
+                continue
+
+            try:
+                self._process(name, data, digest)
+            except Exception as exc:  # noqa: BLE001 - one bad extract must not stop the watcher
+                self._manifest[name] = {"signature": signature, "content_hash": digest, "error": str(exc)}
+                self._remove_outputs(name)
+                result.failed[name] = str(exc)
+            else:
+                self._manifest[name] = {
+                    "signature": signature,
+                    "content_hash": digest,
+                    "generated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                }
+                result.generated.append(name)
+
+        for name in sorted(set(self._manifest) - seen):
+            del self._manifest[name]
+            result.removed.append(name)
+            dirty = True
+        if dirty:
+            self._save_manifest()
+        return result
+
+    def _process(self, name: str, data: bytes, digest: str) -> None:
+        df, meta = load_dataset(data, digest, self.cache, Job(name), self.use_arrow, self.schemas)
+
+        graph = build_dashboard_graph()
+        set_dataset(graph, df, meta, digest)
+        graph.set_input("top_n", self.top_n)
+        graph.set_input("chart_format", self.chart_format)
+        graph.set_input("chart_dpi", self.chart_dpi)
+        graph.set_input("show_metric_summary", True)
+        graph.set_input("report_title", os.path.splitext(name)[0])
+
+        summary = graph.get("kpis")
+        payload = {
+            "source": name,
+            "content_hash": digest,
+            "generated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "columns": {role: graph.get(role) for role in ("date_col", "metric_col", "category_col")},
+            "schema_reused": bool(meta.get("schema_reused")),
+            "kpis": [{"label": label, "value": value} for label, value in summary],
+            "metric_summary": graph.get("metric_summary"),
+        }
+        paths = self.output_paths(name)
+        report = graph.get("report")
+        atomic_write(paths["report"], lambda fh: fh.write(report))
+        atomic_write(paths["kpis"], lambda fh: fh.write(json.dumps(payload, indent=2).encode("utf-8")))
+
+    def run(
+        self,
+        interval: float = 30.0,
+        on_pass: Optional[Callable[[WatchPass], None]] = None,
+        max_passes: Optional[int] = None,
+    ) -> None:
+        """Scan repeatedly until interrupted (or ``max_passes`` scans).
+
+        Args:
+            interval: Seconds between the end of one pass and the next
+            on_pass: Optional callable receiving each ``WatchPass``
+            max_passes: Stop after this many passes; None runs forever
+        """
+        passes = 0
+        while max_passes is None or passes < max_passes:
+            outcome = self.scan()
+            passes += 1
+            if on_pass is not None:
+                on_pass(outcome)
+            if max_passes is None or passes < max_passes:
+                time.sleep(interval)
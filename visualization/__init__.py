@@ -1,4 +1,22 @@
 """Visualization and charting module."""
-from .charts import build_trend_chart, build_category_chart
+from .charts import (
+    CHART_FORMATS,
+    aggregate_trend,
+    aggregate_categories,
+    build_trend_chart,
+    build_category_chart,
+    plot_trend_chart,
+    plot_category_chart,
+    render_figure,
+)
 
-__all__ = ["build_trend_chart", "build_category_chart"]
+__all__ = [
+    "CHART_FORMATS",
+    "aggregate_trend",
+    "aggregate_categories",
+    "build_trend_chart",
+    "build_category_chart",
+    "plot_trend_chart",
+    "plot_category_chart",
+    "render_figure",
+]
@@ -1,11 +1,37 @@
-"""Chart generation utilities."""
-from typing import Optional
+"""Chart generation utilities.
 
-import matplotlib.pyplot as plt
+Figures are created without pyplot, whose global figure manager is not
+thread-safe, so a figure can be built and rendered entirely inside one
+worker thread while other threads render theirs.
+"""
+from io import BytesIO
+from typing import Optional, Tuple
+
+import matplotlib
 import pandas as pd
+from matplotlib.figure import Figure
+
+from analytics.buckets import bucket_sums
+from data.dtypes import to_float_array
+
+CHART_FORMATS = ("png", "svg")
+
+
+def aggregate_trend(df: pd.DataFrame, date_col: str, metric_col: str) -> pd.Series:
+    """Sum a metric per time bucket (weekly or monthly depending on span).
+
+    Args:
+        df: Input DataFrame
+        date_col: Name of the date column
+        metric_col: Name of the metric column
 
+    Returns:
+        Metric sums indexed by bucket timestamp
+    """
+    return bucket_sums(df[date_col], df[metric_col])[0]
 
-def build_trend_chart(df: pd.DataFrame, date_col: str, metric_col: str) -> plt.Figure:
+
+def build_trend_chart(df: pd.DataFrame, date_col: str, metric_col: str) -> Figure:
     """Build a time series trend chart.
 
     Shows the metric aggregated over time (weekly or monthly depending on span).
@@ -18,18 +44,29 @@ def build_trend_chart(df: pd.DataFrame, date_col: str, metric_col: str) -> plt.F
     Returns:
         Matplotlib Figure object
     """
-    tmp = df[[date_col, metric_col]].dropna().sort_values(date_col)
-    span_days = (tmp[date_col].max() - tmp[date_col].min()).days
-    freq = "MS" if span_days >= 60 else "W-MON"
-    series = tmp.set_index(date_col)[metric_col].resample(freq).sum()
+    return plot_trend_chart(aggregate_trend(df, date_col, metric_col), metric_col)
+
+
+def plot_trend_chart(series: pd.Series, metric_col: str) -> Figure:
+    """Plot metric totals that are already aggregated per time bucket.
+
+    Args:
+        series: Metric sums indexed by bucket timestamp
+        metric_col: Name of the metric column, used for labels
+
+    Returns:
+        Matplotlib Figure object
+    """
+    values = to_float_array(series)
 
     # Enhanced styling
-    fig, ax = plt.subplots(figsize=(10, 6))
-    ax.plot(series.index, series.values, linewidth=2.5, color='#3b82f6', marker='o',
+    fig = Figure(figsize=(10, 6))
+    ax = fig.subplots()
+    ax.plot(series.index, values, linewidth=2.5, color='#3b82f6', marker='o',
             markersize=6, markerfacecolor='#2563eb', markeredgecolor='white', markeredgewidth=1.5)
 
     # Fill area under curve
-    ax.fill_between(series.index, series.values, alpha=0.15, color='#3b82f6')
+    ax.fill_between(series.index, values, alpha=0.15, color='#3b82f6')
 
     # Styling
     ax.set_title(f"{metric_col} over time", fontsize=14, fontweight='bold', color='#1e40af', pad=20)
@@ -48,62 +85,106 @@ def build_trend_chart(df: pd.DataFrame, date_col: str, metric_col: str) -> plt.F
     ax.spines['left'].set_color('#e2e8f0')
     ax.spines['bottom'].set_color('#e2e8f0')
 
-    plt.tight_layout()
+    fig.tight_layout()
     return fig
 
 
-def build_category_chart(
+def aggregate_categories(
     df: pd.DataFrame,
     category_col: str,
     metric_col: Optional[str],
     top_n: int,
-) -> plt.Figure:
-    """Build a horizontal bar chart for top categories.
+) -> Tuple[pd.Series, Optional[str]]:
+    """Aggregate the top categories for the category chart.
 
-    If a metric column is provided, aggregates by sum.
-    Otherwise, shows counts.
+    If a numeric metric column is provided, sums it per category (largest
+    first). Otherwise, counts rows per category (smallest of the top first).
 
     Args:
         df: Input DataFrame
         category_col: Name of the category column
         metric_col: Name of the metric column (can be None)
-        top_n: Number of top categories to display
+        top_n: Number of top categories to keep
 
     Returns:
-        Matplotlib Figure object
+        (values indexed by category, summed metric column or None for counts)
     """
     if metric_col and pd.api.types.is_numeric_dtype(df[metric_col]):
         agg = (
             df[[category_col, metric_col]]
             .dropna()
-            .groupby(category_col)[metric_col]
+            .groupby(category_col, observed=True)[metric_col]
             .sum()
             .sort_values(ascending=False)
             .head(top_n)
         )
+        return agg, metric_col
+    counts = df[category_col].dropna().value_counts()
+    # Categorical columns also list categories that don't occur
+    agg = counts[counts > 0].head(top_n).sort_values(ascending=True)
+    return agg, None
+
+
+def build_category_chart(
+    df: pd.DataFrame,
+    category_col: str,
+    metric_col: Optional[str],
+    top_n: int,
+) -> Figure:
+    """Build a horizontal bar chart for top categories.
+
+    If a metric column is provided, aggregates by sum.
+    Otherwise, shows counts.
+
+    Args:
+        df: Input DataFrame
+        category_col: Name of the category column
+        metric_col: Name of the metric column (can be None)
+        top_n: Number of top categories to display
+
+    Returns:
+        Matplotlib Figure object
+    """
+    agg, summed = aggregate_categories(df, category_col, metric_col, top_n)
+    return plot_category_chart(agg, category_col, summed, top_n)
+
+
+def plot_category_chart(
+    agg: pd.Series,
+    category_col: str,
+    metric_col: Optional[str],
+    top_n: int,
+) -> Figure:
+    """Plot category totals (or counts) that are already aggregated.
+
+    Args:
+        agg: Values indexed by category, in display order
+        category_col: Name of the category column
+        metric_col: Name of the summed metric column, or None for counts
+        top_n: Number of top categories, used in the title
+
+    Returns:
+        Matplotlib Figure object
+    """
+    if metric_col:
         title = f"Top {top_n} {category_col} by {metric_col}"
         x_label = metric_col
     else:
-        agg = (
-            df[category_col]
-            .dropna()
-            .value_counts()
-            .head(top_n)
-            .sort_values(ascending=True)
-        )
         title = f"Top {top_n} {category_col} by count"
         x_label = "Count"
 
     # Enhanced styling
-    fig, ax = plt.subplots(figsize=(10, 6))
+    fig = Figure(figsize=(10, 6))
+    ax = fig.subplots()
 
     # Create gradient colors from light to dark blue
-    colors = plt.cm.Blues(range(50, 255, 205 // len(agg)))[::-1]
+    colors = matplotlib.colormaps["Blues"](range(50, 255, 205 // len(agg)))[::-1]
 
-    bars = ax.barh(agg.index.astype(str), agg.values, color=colors, edgecolor='white', linewidth=1.5)
+    values = to_float_array(agg)
+    bars = ax.barh(agg.index.astype(str), values, color=colors, edgecolor='white', linewidth=1.5)
 
     # Add value labels on bars
-    for i, (bar, value) in enumerate(zip(bars, agg.values)):
+    for i, (bar, value) in enumerate(zip(bars, values)):
         width = bar.get_width()
         ax.text(width, bar.get_y() + bar.get_height()/2, f' {value:,.0f}',
                 ha='left', va='center', fontsize=9, fontweight='600', color='#475569')
@@ -124,5 +205,32 @@ def build_category_chart(
     ax.spines['left'].set_color('#e2e8f0')
     ax.spines['bottom'].set_color('#e2e8f0')
 
-    plt.tight_layout()
+    fig.tight_layout()
     return fig
+
+
+def render_figure(fig: Figure, fmt: str = "png", dpi: int = 110, close: bool = True) -> bytes:
+    """Render a figure to image bytes once, for reuse by the UI and the report.
+
+    PNG output is rasterized at ``dpi``; SVG output is vector and ignores it
+    for everything but embedded raster artists.
+
+    Args:
+        fig: Matplotlib Figure to render
+        fmt: Output format, one of ``CHART_FORMATS``
+        dpi: Resolution for raster output
+        close: Whether to close the figure after rendering to free its memory
+
+    Returns:
+        Encoded image as bytes
+    """
+    if fmt not in CHART_FORMATS:
+        raise ValueError(f"Unsupported chart format {fmt!r}; expected one of {CHART_FORMATS}")
+    buffer = BytesIO()
+    fig.savefig(buffer, format=fmt, dpi=dpi, bbox_inches="tight")
+    if close and fig.canvas.manager is not None:
+        # Only figures created through pyplot are registered with it
+        import matplotlib.pyplot as plt
+
+        plt.close(fig)
+    return buffer.getvalue()
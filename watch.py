@@ -0,0 +1,74 @@
+"""Watch a directory and regenerate DataCanvas reports when extracts change.
+
+Every pass looks for new or changed CSV files (by size and modification
+time, confirmed by content hash) and writes ``<name>.pdf`` and
+``<name>.kpis.json`` for each into the output directory. Unchanged files
+are skipped without being read; cleaning and column inference reuse the
+app's on-disk caches.
+
+Usage:
+    python watch.py /shared/extracts --output /shared/reports --interval 60
+    python watch.py /shared/extracts --output /shared/reports --once
+"""
+import argparse
+import os
+import time
+
+from config import CFG
+from data import DatasetCache, SchemaCache
+from pipeline import FolderWatcher, WatchPass
+
+
+def print_pass(outcome: WatchPass) -> None:
+    """Log one pass, staying quiet when nothing changed."""
+    stamp = time.strftime("%H:%M:%S")
+    for name in outcome.generated:
+        print(f"[{stamp}] generated report for {name}")
+    for name, error in outcome.failed.items():
+        print(f"[{stamp}] failed on {name}: {error}")
+    for name in outcome.removed:
+        print(f"[{stamp}] {name} was removed")
+    if outcome.pending:
+        print(f"[{stamp}] waiting for {', '.join(outcome.pending)} to settle")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("directory", help="Directory to watch for CSV extracts")
+    parser.add_argument("--output", required=True, help="Directory receiving the PDFs and KPI JSON files")
+    parser.add_argument("--interval", type=float, default=30.0, help="Seconds between passes")
+    parser.add_argument("--pattern", default="*.csv", help="Glob of file names to process")
+    parser.add_argument("--settle", type=float, default=2.0,
+                        help="Skip files modified within this many seconds (still being written)")
+    parser.add_argument("--once", action="store_true", help="Run a single pass and exit")
+    args = parser.parse_args()
+
+    import matplotlib
+    matplotlib.use("Agg")
+
+    cache = schemas = None
+    if CFG.cache_dir:
+        cache = DatasetCache(CFG.cache_dir, CFG.cache_max_mb * 1024 * 1024)
+        schemas = SchemaCache(os.path.join(CFG.cache_dir, "schemas"), CFG.schema_cache_max_entries)
+
+    watcher = FolderWatcher(
+        args.directory,
+        args.output,
+        cache=cache,
+        schemas=schemas,
+        pattern=args.pattern,
+        settle_seconds=args.settle,
+        chart_format=CFG.chart_format,
+        chart_dpi=CFG.chart_dpi,
+        top_n=CFG.top_n_categories,
+        use_arrow=CFG.use_arrow_dtypes,
+    )
+    print(f"Watching {os.path.abspath(args.directory)} -> {os.path.abspath(args.output)}")
+    try:
+        watcher.run(args.interval, on_pass=print_pass, max_passes=1 if args.once else None)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()